@@ -412,6 +412,71 @@ def delete_item(table: str, key: str) -> bool:
     return True
 
 
+# Results of delete_item_if
+DELETE_OK = "OK"
+DELETE_NOT_FOUND = "NOT_FOUND"
+DELETE_FORBIDDEN = "FORBIDDEN"
+DELETE_BAD_STATUS = "BAD_STATUS"
+
+
+def delete_item_if(
+    table: str,
+    key: str,
+    owner_id: str,
+    allowed_statuses: List[str],
+    owner_field: str = "user_id",
+) -> str:
+    """
+    Atomically delete a JSON row only if it belongs to *owner_id* and its
+    status is one of *allowed_statuses* (compare-and-delete in one statement,
+    so nothing can change the row between the check and the delete).
+
+    Returns DELETE_OK, or DELETE_NOT_FOUND / DELETE_FORBIDDEN / DELETE_BAD_STATUS
+    explaining why nothing was deleted.
+    """
+    pk_map = {
+        "loans": "loan_id",
+        "kyc": "user_id",
+    }
+    pk_col = pk_map.get(table)
+    if not pk_col:
+        raise ValueError(f"Unknown table: {table}")
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        f"""
+        DELETE FROM {table}
+        WHERE {pk_col} = %s
+        AND json_data->>%s = %s
+        AND UPPER(COALESCE(json_data->>'status', '')) = ANY(%s)
+        RETURNING {pk_col}
+        """,
+        (key, owner_field, owner_id, [s.upper() for s in allowed_statuses]),
+    )
+    deleted = cursor.fetchone()
+    conn.commit()
+
+    if deleted:
+        release_connection(conn)
+        return DELETE_OK
+
+    # Nothing deleted — work out why (slow path only)
+    cursor.execute(f"SELECT json_data FROM {table} WHERE {pk_col} = %s", (key,))
+    row = cursor.fetchone()
+    release_connection(conn)
+
+    if not row:
+        return DELETE_NOT_FOUND
+    data = row['json_data']
+    if isinstance(data, str):
+        data = json.loads(data)
+    if data.get(owner_field) != owner_id:
+        return DELETE_FORBIDDEN
+    return DELETE_BAD_STATUS
+
+
 def get_repayments(loan_id: str) -> List[Dict[str, Any]]:
     """Specific helper for fetching list of repayments"""
     conn = get_connection()
@@ -468,6 +533,32 @@ def get_user_loan_summary(phone: str) -> dict:
         "active_role": active_role,
     }
 
+def get_loan_stats_aggregate() -> Dict[str, Any]:
+    """
+    Aggregate loan amount / status counts inside Postgres in one scan,
+    instead of shipping every loan's JSON to Python and summing there.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT
+            COALESCE(SUM(COALESCE((json_data->>'amount')::numeric, 0))
+                FILTER (WHERE json_data->>'status' IN ('ACTIVE', 'REPAID', 'APPROVED')), 0) AS total_amount,
+            COUNT(*) FILTER (WHERE json_data->>'status' = 'REPAID') AS repaid,
+            COUNT(*) FILTER (WHERE json_data->>'status' IN ('ACTIVE', 'REPAID')) AS active
+        FROM loans
+        """
+    )
+    row = cursor.fetchone()
+    release_connection(conn)
+    return {
+        "total_amount": float(row['total_amount']),
+        "repaid": row['repaid'],
+        "active": row['active'],
+    }
+
+
 def add_repayment(repayment_id: str, loan_id: str, data: Dict[str, Any]):
     """Specific helper for adding repayment"""
     conn = get_connection()
@@ -0,0 +1,61 @@
+"""
+Write-behind queue for non-critical put_item calls.
+
+Intermediate progress saves (e.g. OCR / screening results during KYC
+background verification) don't need to block the caller. They are queued
+and written by a single daemon thread. Writes to the same (table, key)
+coalesce, so only the latest value is written. Call flush() before reading
+a row back or making a terminal write that must land after them.
+"""
+
+import copy
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from db.database import put_item
+
+log = logging.getLogger("artha.db")
+
+_pending: Dict[Tuple[str, str], Any] = {}
+_writing = False
+_cond = threading.Condition()
+_thread: Optional[threading.Thread] = None
+
+
+def enqueue_put(table: str, key: str, data: Any):
+    """Queue put_item(table, key, data); a snapshot of *data* is taken now."""
+    global _thread
+    snapshot = copy.deepcopy(data)
+    with _cond:
+        # Re-insert so a coalesced key moves to the back of the queue
+        _pending.pop((table, key), None)
+        _pending[(table, key)] = snapshot
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name="db-writer", daemon=True)
+            _thread.start()
+        _cond.notify_all()
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    """Block until every queued write has been attempted. False on timeout."""
+    with _cond:
+        return _cond.wait_for(lambda: not _pending and not _writing, timeout)
+
+
+def _run():
+    global _writing
+    while True:
+        with _cond:
+            _cond.wait_for(lambda: _pending)
+            (table, key), data = next(iter(_pending.items()))
+            del _pending[(table, key)]
+            _writing = True
+        try:
+            put_item(table, key, data)
+        except Exception:
+            log.exception("Deferred write to %s/%s failed", table, key)
+        finally:
+            with _cond:
+                _writing = False
+                _cond.notify_all()
@@ -1,6 +1,14 @@
+import logging
 import os
 import sys
 
+# Service loggers (artha.*) — set LOG_LEVEL=WARNING in production,
+# DEBUG to see the per-step KYC / verification traces.
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+)
+
 # ── Exclude venv310 from uvicorn --reload watcher ──
 # This prevents constant restarts when packages inside venv310 are touched.
 if "--reload" in sys.argv or os.environ.get("UVICORN_RELOAD"):
@@ -9,6 +17,7 @@ if "--reload" in sys.argv or os.environ.get("UVICORN_RELOAD"):
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from db.database import init_db
+from utils.upload_utils import MAX_IMAGE_BYTES, MAX_VIDEO_BYTES, UploadSizeLimitMiddleware
 
 # Initialize DB on import (or use lifespan event)
 init_db()
@@ -31,6 +40,16 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# -------- UPLOAD SIZE LIMITS --------
+# Added before CORS so 413 responses still carry CORS headers.
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/upload": MAX_VIDEO_BYTES,
+        "/dev/": MAX_VIDEO_BYTES + MAX_IMAGE_BYTES,
+    },
+)
+
 # -------- CORS --------
 app.add_middleware(
     CORSMiddleware,
@@ -88,6 +107,16 @@ if not os.path.exists(pdf_path):
 app.mount("/pdfs", StaticFiles(directory=pdf_path), name="pdfs")
 
 
+# -------- MODEL WARM-UP --------
+# Set WARMUP_MODELS=0 to skip (e.g. for quick --reload dev loops).
+
+@app.on_event("startup")
+def warmup():
+    if os.getenv("WARMUP_MODELS", "1") != "0":
+        from services.warmup import start_warmup
+        start_warmup()
+
+
 
 # -------- ROOT HEALTH CHECK --------
 
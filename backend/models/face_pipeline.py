@@ -251,14 +251,13 @@ def verify_faces_from_video(
             result["reason"] = "Could not extract frames from video"
             return result
 
-        best_distance = None
+        distances = []
 
         for frame_path in frames:
             match_result, distance = face_match(frame_path, id_image_path)
 
             if distance is not None:
-                if best_distance is None or distance < best_distance:
-                    best_distance = distance
+                distances.append(distance)
 
             if match_result:
                 result["face_match"] = True
@@ -270,6 +269,7 @@ def verify_faces_from_video(
                 break
 
         if not result["face_match"]:
+            best_distance = min(distances) if distances else None
             result["distance"] = round(best_distance, 4) if best_distance else 1.0
             result["reason"] = "Face in video does not match ID card photo"
 
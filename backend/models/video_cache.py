@@ -0,0 +1,68 @@
+"""
+Decoded key-frame cache shared by the video models.
+
+The KYC flow runs face matching and liveness on the same selfie video at
+the same time, and both start by decoding key frames. Frames are cached
+per (path, mtime, size), and concurrent callers for the same video wait
+on a single decode instead of each seeking through the file.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+# A 1080p BGR frame is ~6 MB; 3 frames per video, a handful of videos.
+_MAX_VIDEOS = 4
+
+_CacheKey = Tuple[str, int, int]
+_cache: "OrderedDict[_CacheKey, List[np.ndarray]]" = OrderedDict()
+_inflight: Dict[_CacheKey, threading.Lock] = {}
+_lock = threading.Lock()
+
+
+def get_key_frames(
+    video_path: str,
+    decode: Callable[[str], List[np.ndarray]],
+    st: os.stat_result = None,
+) -> List[np.ndarray]:
+    """
+    Return decode(video_path), decoding at most once per file version.
+    Pass *st* if the caller already stat'ed the file.
+    """
+    if st is None:
+        try:
+            st = os.stat(video_path)
+        except OSError:
+            # Let the decoder report the missing/unreadable file
+            return decode(video_path)
+
+    key = (os.path.abspath(video_path), st.st_mtime_ns, st.st_size)
+    with _lock:
+        frames = _cache.get(key)
+        if frames is not None:
+            _cache.move_to_end(key)
+            return frames
+        key_lock = _inflight.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _lock:
+            frames = _cache.get(key)
+        if frames is None:
+            try:
+                frames = decode(video_path)
+            finally:
+                if frames is None:
+                    with _lock:
+                        _inflight.pop(key, None)
+            with _lock:
+                # An empty result may be a transient open failure; let the
+                # next caller retry the decode rather than pinning it
+                if frames:
+                    _cache[key] = frames
+                    while len(_cache) > _MAX_VIDEOS:
+                        _cache.popitem(last=False)
+                _inflight.pop(key, None)
+    return frames
@@ -19,12 +19,16 @@ Optimizations applied:
 """
 
 import cv2
+import hashlib
 import os
 import time as _time
 import tempfile
+import zipfile
 import numpy as np
 from typing import List, Optional
 
+from models.video_cache import get_key_frames
+
 # ── Model pre-warming ──────────────────────────────────────────────
 # Load ArcFace + SSD detector once at module level so subsequent
 # calls don't pay the cold-start cost.
@@ -60,14 +64,26 @@ except Exception:
 # VIDEO → FRAME EXTRACTION
 # =========================
 
-def extract_frames(video_path: str) -> List[str]:
+def _open_video(video_path: str):
     """
-    Extract 3 key frames: start, middle, end of video.
-    Fewer frames = faster verification with negligible accuracy loss.
+    Open a video with the FFmpeg backend and request hardware decode
+    (VAAPI / NVDEC / D3D11 — whatever OpenCV finds). Requires OpenCV >= 4.5.4;
+    older builds or machines without a usable device fall back to the
+    default software-decoding backend.
     """
-    t0 = _time.time()
-    print(f"\n[DEBUG] Extracting frames from: {video_path}")
-    cap = cv2.VideoCapture(video_path)
+    hw_accel = getattr(cv2, "CAP_PROP_HW_ACCELERATION", None)
+    accel_any = getattr(cv2, "VIDEO_ACCELERATION_ANY", None)
+    if hw_accel is not None and accel_any is not None:
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [hw_accel, accel_any])
+        if cap.isOpened():
+            return cap
+        cap.release()
+    return cv2.VideoCapture(video_path)
+
+
+def _decode_key_frames(video_path: str) -> List[np.ndarray]:
+    """Decode 3 key frames (start, middle, end) as BGR arrays."""
+    cap = _open_video(video_path)
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
     if total_frames <= 0:
@@ -81,19 +97,37 @@ def extract_frames(video_path: str) -> List[str]:
     ]
     indices = sorted(list(set([min(i, total_frames - 1) for i in indices])))
 
-    frame_paths = []
+    frames = []
 
     for idx in indices:
         cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
         success, frame = cap.read()
         if not success:
             continue
+        frames.append(frame)
+
+    cap.release()
+    return frames
+
 
+def extract_frames(video_path: str, st: os.stat_result = None) -> List[str]:
+    """
+    Extract 3 key frames: start, middle, end of video.
+    Fewer frames = faster verification with negligible accuracy loss.
+    Decoded frames are shared via models.video_cache, so face match and
+    liveness on the same video decode it once. Each caller gets its own
+    temp JPEGs (and deletes them).
+    """
+    t0 = _time.time()
+    print(f"\n[DEBUG] Extracting frames from: {video_path}")
+
+    frame_paths = []
+    for frame in get_key_frames(video_path, _decode_key_frames, st):
         tmp = tempfile.NamedTemporaryFile(suffix=".jpg", delete=False)
+        tmp.close()
         cv2.imwrite(tmp.name, frame)
         frame_paths.append(tmp.name)
 
-    cap.release()
     elapsed = _time.time() - t0
     print(f"[TIMING] Frame extraction: {elapsed:.2f}s  ({len(frame_paths)} frames)")
     return frame_paths
@@ -103,8 +137,67 @@ def extract_frames(video_path: str) -> List[str]:
 # FACE MATCH (ARC FACE) — OPTIMIZED
 # =========================
 
-def _get_reference_embedding(photo_path: str):
+# Reference embeddings are persisted as int8 + one float32 scale
+# (512 B instead of 2 KB per user for ArcFace). Precision loss lives on the
+# stored side only; frame embeddings stay FP32.
+_EMBEDDING_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "embeddings"
+)
+
+
+def _embedding_cache_path(photo_path: str, st: os.stat_result = None) -> Optional[str]:
+    """Cache file for *photo_path*, keyed on path + mtime + size + model."""
+    if st is None:
+        try:
+            st = os.stat(photo_path)
+        except OSError:
+            return None
+    key = f"{os.path.abspath(photo_path)}|{st.st_mtime_ns}|{st.st_size}|{_MODEL}|{_DETECTOR}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(_EMBEDDING_CACHE_DIR, f"{digest}.npz")
+
+
+def _save_quantized_embedding(path: str, emb: np.ndarray):
+    """Symmetric int8 quantization: q = round(emb / scale), scale = max|emb| / 127."""
+    scale = float(np.max(np.abs(emb))) / 127.0 or 1.0
+    q = np.round(emb / scale).astype(np.int8)
+    os.makedirs(_EMBEDDING_CACHE_DIR, exist_ok=True)
+    # Write beside the target and rename, so a concurrent verification never
+    # loads a half-written .npz
+    fd, tmp_path = tempfile.mkstemp(dir=_EMBEDDING_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, q=q, scale=np.float32(scale))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _load_quantized_embedding(path: str) -> Optional[np.ndarray]:
+    """Dequantize a cached embedding back to a unit-norm float32 vector."""
+    try:
+        with np.load(path) as data:
+            emb = data["q"].astype(np.float32) * data["scale"]
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+    norm = np.linalg.norm(emb)
+    return emb / norm if norm else emb
+
+
+def _get_reference_embedding(photo_path: str, st: os.stat_result = None):
     """Compute the reference photo embedding ONCE and cache it."""
+    cache_path = _embedding_cache_path(photo_path, st)
+    if cache_path:
+        # A missing cache file just fails the load (OSError) — no extra stat
+        cached = _load_quantized_embedding(cache_path)
+        if cached is not None:
+            print(f"[TIMING] Reference embedding: cache hit")
+            return cached
+
     from deepface import DeepFace
     t0 = _time.time()
     embeddings = DeepFace.represent(
@@ -118,7 +211,13 @@ def _get_reference_embedding(photo_path: str):
     print(f"[TIMING] Reference embedding: {elapsed:.2f}s")
     if not embeddings:
         raise ValueError("No face detected in reference photo")
-    return np.array(embeddings[0]["embedding"])
+    emb = np.array(embeddings[0]["embedding"], dtype=np.float32)
+    if cache_path:
+        try:
+            _save_quantized_embedding(cache_path, emb)
+        except OSError as e:
+            print(f"[DEBUG] Could not cache reference embedding: {e}")
+    return emb
 
 
 def face_match(video_frame_path: str, photo_path: str,
@@ -187,7 +286,9 @@ def face_match(video_frame_path: str, photo_path: str,
 def verify_video_identity(
     video_path: str,
     reference_photo_path: str,
-    save_frame_to: str = None
+    save_frame_to: str = None,
+    video_stat: os.stat_result = None,
+    reference_stat: os.stat_result = None
 ) -> dict:
     """
     Video identity verification - Face matching only
@@ -197,6 +298,8 @@ def verify_video_identity(
         video_path: Path to video file
         reference_photo_path: Path to reference photo (KYC selfie)
         save_frame_to: Optional path to save the extracted frame for display
+        video_stat / reference_stat: os.stat results the caller already has;
+            they key the frame and embedding caches without another stat
     """
     t_total = _time.time()
     print("=" * 40)
@@ -207,19 +310,19 @@ def verify_video_identity(
     _warm_models()
 
     # ── 1. Extract frames from video ──
-    frames = extract_frames(video_path)
+    frames = extract_frames(video_path, video_stat)
 
     # ── 2. Compute reference embedding ONCE ──
     print(f"\n[DEBUG] Computing reference embedding: {reference_photo_path}")
     try:
-        ref_embedding = _get_reference_embedding(reference_photo_path)
+        ref_embedding = _get_reference_embedding(reference_photo_path, reference_stat)
     except Exception as e:
         print(f"[ERROR] Cannot get reference embedding: {e}")
         ref_embedding = None  # will fall back to full verify per frame
 
     # ── 3. Match each frame (early exit) ──
     face_verified = False
-    best_face_distance = None
+    distances = []
     matched_frame = None
     matched_frame_path = None
 
@@ -229,8 +332,7 @@ def verify_video_identity(
         )
 
         if distance is not None:
-            if best_face_distance is None or distance < best_face_distance:
-                best_face_distance = distance
+            distances.append(distance)
 
         if match_result:
             face_verified = True
@@ -239,6 +341,9 @@ def verify_video_identity(
             print(f"[DEBUG] Face verified on frame {matched_frame}!")
             break
 
+    # Single reduction instead of a running-min with a None sentinel
+    best_face_distance = min(distances) if distances else None
+
     # ── 4. Save extracted frame ──
     saved_frame_ref = None
     if save_frame_to:
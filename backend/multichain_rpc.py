@@ -1,4 +1,5 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
 from dotenv import load_dotenv
@@ -16,6 +17,19 @@ CHAIN_NAME = os.getenv("MULTICHAIN_CHAIN_NAME", "artha-chain")
 URL = f"http://{RPC_HOST}:{RPC_PORT}"
 HEADERS = {"content-type": "application/json"}
 
+# One keep-alive pool shared by every caller (including the explorer's RPC
+# thread pool), so RPCs reuse TCP connections instead of reconnecting.
+RPC_POOL_SIZE = 32
+RPC_TIMEOUT = 5  # seconds per RPC (connect / read)
+_session = requests.Session()
+_session.auth = (RPC_USER, RPC_PASSWORD)
+_session.headers.update(HEADERS)
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=RPC_POOL_SIZE))
+
+
+class MultiChainRPCError(Exception):
+    """The node answered with a JSON-RPC error, so the call had no effect."""
+
 
 def call_rpc(method, params=None, rpc_id=1):
     if params is None:
@@ -29,12 +43,10 @@ def call_rpc(method, params=None, rpc_id=1):
     }
 
     try:
-        response = requests.post(
+        response = _session.post(
             URL,
             data=json.dumps(payload),
-            auth=(RPC_USER, RPC_PASSWORD),
-            headers=HEADERS,
-            timeout=5 # Prevent hanging
+            timeout=RPC_TIMEOUT # Prevent hanging
         )
     except requests.exceptions.ConnectionError:
         print(f"[MultiChain] WARNING: Cannot connect to MultiChain at {URL}. Is it running?")
@@ -48,11 +60,67 @@ def call_rpc(method, params=None, rpc_id=1):
 
     result = response.json()
     if "error" in result and result["error"]:
-        raise Exception(result["error"])
+        raise MultiChainRPCError(result["error"])
 
     return result["result"]
 
 
+def call_rpc_batch(calls):
+    """
+    Send several RPCs in ONE JSON-RPC batch request (one HTTP round-trip).
+
+    calls: list of (method, params) tuples
+    Returns a list of results in the same order as *calls*, or None if
+    MultiChain is unreachable. Individual calls that error yield None.
+    """
+    payload = [
+        {
+            "method": method,
+            "params": params or [],
+            "id": i,
+            "chain_name": CHAIN_NAME,
+        }
+        for i, (method, params) in enumerate(calls)
+    ]
+
+    try:
+        response = _session.post(
+            URL,
+            data=json.dumps(payload),
+            timeout=RPC_TIMEOUT # Prevent hanging
+        )
+    except requests.exceptions.ConnectionError:
+        print(f"[MultiChain] WARNING: Cannot connect to MultiChain at {URL}. Is it running?")
+        return None
+    except requests.exceptions.Timeout:
+        print(f"[MultiChain] WARNING: Connection to MultiChain timed out.")
+        return None
+    except Exception as e:
+        print(f"[MultiChain] WARNING: Batch RPC call failed: {e}")
+        return None
+
+    # A 401 (empty / HTML body) or a lone error object isn't a batch reply;
+    # return None so callers fall back as if MultiChain were unreachable
+    try:
+        replies = response.json()
+    except ValueError:
+        print(f"[MultiChain] WARNING: Batch RPC returned a non-JSON body (HTTP {response.status_code})")
+        return None
+    if not isinstance(replies, list):
+        print(f"[MultiChain] WARNING: Batch RPC returned a non-batch reply (HTTP {response.status_code}): {replies}")
+        return None
+
+    results = [None] * len(calls)
+    for entry in replies:
+        if not isinstance(entry, dict) or not isinstance(entry.get("id"), int) or not 0 <= entry["id"] < len(calls):
+            continue
+        if entry.get("error"):
+            print(f"[MultiChain] WARNING: Batched '{calls[entry['id']][0]}' failed: {entry['error']}")
+            continue
+        results[entry["id"]] = entry.get("result")
+    return results
+
+
 # -------- STREAM HELPERS --------
 
 def create_stream(stream_name: str, open_stream: bool = True):
@@ -62,6 +130,18 @@ def create_stream(stream_name: str, open_stream: bool = True):
     return result
 
 
+def stream_exists(stream_name: str):
+    """True/False whether *stream_name* exists, or None if MultiChain is unreachable."""
+    try:
+        result = call_rpc("liststreams", [stream_name])
+    except Exception:
+        # Unknown streams come back as an RPC error
+        return False
+    if result is None:
+        return None
+    return bool(result)
+
+
 def publish_to_stream(stream: str, key: str, value: str):
     """
     Publish hash to stream
@@ -72,14 +152,50 @@ def publish_to_stream(stream: str, key: str, value: str):
     return result
 
 
-def get_stream_items(stream: str):
-    result = call_rpc("liststreamitems", [stream])
+def publish_multi_to_stream(stream: str, items):
+    """
+    Publish several (key, hex_value) items to *stream* in one transaction
+    via publishmulti. Returns the single txid shared by all items.
+    """
+    result = call_rpc("publishmulti", [stream, [{"key": key, "data": value} for key, value in items]])
+    if result is None:
+        raise Exception(f"MultiChain is not available. Cannot publish to stream '{stream}'.")
+    return result
+
+
+def get_stream_items(stream: str, count: int = None, start: int = None):
+    """
+    List stream items (oldest first). With *count*/*start* only that window
+    is fetched — MultiChain's liststreamitems <stream> <verbose> <count> <start>,
+    where a negative start counts back from the end. Default: all items.
+    """
+    params = [stream]
+    if count is not None:
+        params += [False, count]
+        if start is not None:
+            params.append(start)
+    result = call_rpc("liststreamitems", params)
     return result if result is not None else []
 
 
-def get_stream_key_items(stream: str, key: str):
+def get_stream_item_count(stream: str):
+    """Number of items in *stream* (from liststreams), or None if unavailable."""
+    result = call_rpc("liststreams", [stream])
+    if not result:
+        return None
+    return result[0].get("items")
+
+
+def get_stream_key_items(stream: str, key: str, count: int = None, start: int = None):
     """
-    Used for audit verification
+    List the items published under *key* (oldest first). Used for audit
+    verification. *count*/*start* work as in get_stream_items, so
+    count=1, start=-1 fetches just the latest item.
     """
-    result = call_rpc("liststreamkeyitems", [stream, key])
+    params = [stream, key]
+    if count is not None:
+        params += [False, count]
+        if start is not None:
+            params.append(start)
+    result = call_rpc("liststreamkeyitems", params)
     return result if result is not None else []
@@ -45,7 +45,7 @@ async def generate_blockchain_certificate(
     """
     try:
         # Get loan from blockchain
-        items = get_stream_key_items("loan_storage", f"loan_{loan_id}")
+        items = get_stream_key_items("loan_storage", f"loan_{loan_id}", count=1, start=-1)
         
         if not items:
             raise HTTPException(status_code=404, detail="Loan not found on blockchain")
@@ -60,7 +60,7 @@ async def generate_blockchain_certificate(
         loan_hash = loan_data.get("loan_hash")
         
         # Check repayment status
-        repayment_items = get_stream_key_items("loan_repayments", f"repayment_{loan_id}")
+        repayment_items = get_stream_key_items("loan_repayments", f"repayment_{loan_id}", count=1, start=-1)
         is_repaid = bool(repayment_items)
         
         # Create PDF
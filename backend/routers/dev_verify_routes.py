@@ -1,7 +1,5 @@
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 import os
-import shutil
-import uuid
 
 from models.citizenship_ocr_model import verify_citizenship_card
 from models.face_pipeline import (
@@ -10,6 +8,7 @@ from models.face_pipeline import (
     verify_faces_from_video,
 )
 from models.image_verification_model import verify_face_identity
+from utils.upload_utils import MAX_IMAGE_BYTES, MAX_VIDEO_BYTES, save_upload
 
 router = APIRouter(prefix="/dev", tags=["dev"])
 
@@ -17,15 +16,8 @@ UPLOAD_DIR = os.path.join("static", "uploads", "dev")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
-def _save_upload(file: UploadFile) -> str:
-    ext = file.filename.split(".")[-1] if file.filename and "." in file.filename else "bin"
-    filename = f"{uuid.uuid4()}.{ext}"
-    file_path = os.path.join(UPLOAD_DIR, filename)
-
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    return file_path
+async def _save_upload(file: UploadFile, max_bytes: int = MAX_IMAGE_BYTES) -> str:
+    return await save_upload(file, UPLOAD_DIR, max_bytes)
 
 
 @router.post("/ocr")
@@ -36,7 +28,7 @@ async def dev_ocr_check(
     citizenship_no: str = Form(...),
 ):
     try:
-        front_path = _save_upload(front_image)
+        front_path = await _save_upload(front_image)
 
         verify_result = verify_citizenship_card(
             image_path=front_path,
@@ -49,6 +41,8 @@ async def dev_ocr_check(
             "ocr": verify_result.get("extracted_fields", {}),
             "verification": verify_result,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -60,17 +54,17 @@ async def dev_face_match(
     selfie_video: UploadFile | None = File(None),
 ):
     try:
-        id_path = _save_upload(id_image)
+        id_path = await _save_upload(id_image)
 
         if selfie_video is not None:
-            video_path = _save_upload(selfie_video)
+            video_path = await _save_upload(selfie_video, MAX_VIDEO_BYTES)
             face_result = verify_faces_from_video(
                 id_image_path=id_path,
                 video_path=video_path,
             )
             liveness_result = check_liveness_video(video_path)
         elif selfie_image is not None:
-            selfie_path = _save_upload(selfie_image)
+            selfie_path = await _save_upload(selfie_image)
             face_result = verify_face_identity(
                 id_image_path=id_path,
                 selfie_image_path=selfie_path,
@@ -83,6 +77,8 @@ async def dev_face_match(
             "face": face_result,
             "liveness": liveness_result,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -98,8 +94,8 @@ async def dev_kyc_validation(
     """Test endpoint to validate KYC data by running the pipeline on citizenship images."""
     try:
         print(f"[KYC-Validation] Received request for: {full_name}")
-        front_path = _save_upload(front_image)
-        back_path = _save_upload(back_image)
+        front_path = await _save_upload(front_image)
+        back_path = await _save_upload(back_image)
         print(f"[KYC-Validation] Images saved: front={front_path}, back={back_path}")
 
         # Use the same working logic as /dev/ocr endpoint
@@ -147,6 +143,8 @@ async def dev_kyc_validation(
             "flags_for_review": [],
             "raw_text": verify_result.get("raw_text", ""),
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[KYC-Validation] ERROR: {str(e)}")
         import traceback
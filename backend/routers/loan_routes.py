@@ -67,29 +67,35 @@ def delete_loan_route(
     Delete/Cancel a loan request by the borrower.
     Can be deleted if: DRAFT, PENDING_VERIFICATION, PENDING_ADMIN_APPROVAL, or LISTED (not yet accepted by lender)
     """
-    from db.database import get_item, delete_item
+    from db.database import (
+        delete_item_if,
+        get_item,
+        DELETE_NOT_FOUND,
+        DELETE_FORBIDDEN,
+        DELETE_BAD_STATUS,
+    )
     
-    loan = get_item("loans", loan_id)
-    if not loan:
+    deletable_statuses = ["DRAFT", "PENDING_VERIFICATION", "PENDING_ADMIN_APPROVAL", "LISTED"]
+    
+    # Ownership + status check and delete happen in ONE conditional statement,
+    # so a lender can't accept the loan between the check and the delete.
+    result = delete_item_if("loans", loan_id, current_user, deletable_statuses)
+    
+    if result == DELETE_NOT_FOUND:
         raise HTTPException(status_code=404, detail="Loan not found")
     
     # Verify ownership
-    if loan.get("user_id") != current_user:
+    if result == DELETE_FORBIDDEN:
         raise HTTPException(status_code=403, detail="You can only delete your own loans")
     
-    # Check if loan can be deleted
-    status = loan.get("status", "").upper()
-    deletable_statuses = ["DRAFT", "PENDING_VERIFICATION", "PENDING_ADMIN_APPROVAL", "LISTED"]
-    
-    if status not in deletable_statuses:
+    if result == DELETE_BAD_STATUS:
+        loan = get_item("loans", loan_id) or {}
+        status = loan.get("status", "").upper()
         raise HTTPException(
             status_code=400, 
             detail=f"Cannot delete loan with status '{status}'. Only drafts, pending, or listed (unfunded) loans can be deleted."
         )
     
-    # Delete the loan
-    delete_item("loans", loan_id)
-    
     return {
         "message": "Loan deleted successfully",
         "loan_id": loan_id,
@@ -2,16 +2,259 @@
 Public Blockchain Explorer Routes
 Anyone can verify loans without authentication
 """
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+from datetime import datetime, timezone
+import hashlib
 import json
+import re
+import threading
+import time
 
-from multichain_rpc import get_stream_items, get_stream_key_items, call_rpc
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from multichain_rpc import (
+    get_stream_items,
+    get_stream_item_count,
+    get_stream_key_items,
+    call_rpc,
+    call_rpc_batch,
+)
 from blockchain.utils import sha256_hash
-from db.database import get_all_items
+from db.database import get_all_items, get_loan_stats_aggregate
+from utils.response_cache import get_cached, set_cached
+from services.blockchain_service import (
+    LOAN_KEY_PREFIX,
+    REPAYMENT_KEY_PREFIX,
+    register_loan_publish_listener,
+)
+
+router = APIRouter(
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
+)
+
+# DB reads and MultiChain RPCs are blocking; run them here so the event
+# loop keeps serving other requests. Sized to the RPC concurrency we want.
+RPC_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="mcrpc")
+
+
+async def _run_blocking(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(RPC_POOL, fn, *args)
+
+# Cache keys / TTLs (seconds) for the public stats endpoints.
+# Loan writes call utils.response_cache.invalidate("stats:").
+PLATFORM_STATS_KEY = "stats:platform:v1"
+BLOCKCHAIN_STATS_KEY = "stats:blockchain:v1"
+LOAN_STATS_KEY = "stats:loans:v1"
+LOAN_COUNT_KEY = "stats:loan_count:v1"
+STATS_TTL = 30
+RECENT_BLOCKS_TTL = 5
+
+# Loan/tx verification: on-chain data is immutable once confirmed.
+# Loan responses are keyed on the tip height bucket so new confirmations
+# still show up; the tip itself is cached briefly to coalesce requests.
+CHAIN_TIP_KEY = "chain:tip"
+CHAIN_TIP_TTL = 2
+LOAN_VERIFY_TTL = 60
+TX_DETAILS_TTL = 86400
+TX_FINAL_CONFIRMATIONS = 6
+
+# HTTP caching for browsers/CDNs in front of the explorer.
+STATS_CACHE_CONTROL = "public, max-age=15, stale-while-revalidate=30"
+LOAN_MAX_AGE_PER_CONFIRMATION = 60
+LOAN_MAX_AGE = 600  # capped: is_repaid can still flip after confirmation
+
+
+# Encoded bodies keyed by id() of the response-cache entry they came from,
+# so a cache hit reuses the bytes + ETag instead of re-serializing.
+# The body itself is kept alongside to guard against id() reuse.
+_ENCODED_MAX = 512
+_encoded: Dict[int, Tuple[object, bytes, str]] = {}
+
+
+def _dumps(body) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(body, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+
+def _encode(body, memo: bool) -> Tuple[bytes, str]:
+    entry = _encoded.get(id(body)) if memo else None
+    if entry is not None and entry[0] is body:
+        return entry[1], entry[2]
+    content = _dumps(body)
+    etag = 'W/"' + hashlib.blake2b(content, digest_size=8).hexdigest() + '"'
+    if not memo:
+        return content, etag
+    if len(_encoded) >= _ENCODED_MAX:
+        _encoded.clear()
+    _encoded[id(body)] = (body, content, etag)
+    return content, etag
+
+
+def _conditional_json(request: Request, body, cache_control: str, memo: bool = True) -> Response:
+    """
+    Serialize *body* with a weak ETag and Cache-Control header.
+    Returns an empty 304 when the client's If-None-Match already has it.
+    Pass memo=False for bodies that aren't held in the response cache.
+    """
+    content, etag = _encode(body, memo)
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def _chain_tip() -> int:
+    tip = get_cached(CHAIN_TIP_KEY)
+    if tip is None:
+        try:
+            info = call_rpc("getinfo") or {}
+        except Exception:
+            info = {}
+        tip = set_cached(CHAIN_TIP_KEY, info.get("blocks", 0), CHAIN_TIP_TTL)
+    return tip
+
+
+# 32+ hex chars → treat the search query as a (possibly partial) TX hash
+_HEX_RE = re.compile(r"[0-9a-fA-F]{32,}")
+
+_UTC = timezone.utc
+
+
+def _hms(ts) -> str:
+    """HH:MM:SS (UTC) for a unix timestamp, without building a datetime."""
+    return time.strftime("%H:%M:%S", time.gmtime(ts or 0))
+
 
-router = APIRouter()
+def _iso(ts) -> Optional[str]:
+    """ISO-8601 (UTC, seconds) for a unix timestamp, or None if missing."""
+    if not ts:
+        return None
+    return datetime.fromtimestamp(ts, tz=_UTC).isoformat(timespec="seconds")
+
+
+# Secondary index for search: lowercase loan_id -> loan_id, and lowercase
+# txid -> loan_ids (publishmulti puts several loans in one transaction).
+# Filled on publish and from any full-stream scan so partial-match lookups
+# don't have to re-download and re-parse the whole loan_storage stream.
+# index_loan runs on publisher threads while requests scan the index, so
+# every read and write goes through _INDEX_LOCK.
+_LOAN_ID_INDEX: Dict[str, str] = {}
+_TXID_INDEX: Dict[str, List[str]] = {}
+_INDEX_LOCK = threading.Lock()
+# loan_storage item count covered by the last complete scan. While it equals
+# the live stream count every loan is indexed, so an index miss is final.
+# Read and written under _INDEX_LOCK along with the index itself.
+_index_coverage = 0
+
+
+def index_loan(loan_id: str, txid: Optional[str]):
+    if not loan_id:
+        return
+    with _INDEX_LOCK:
+        _LOAN_ID_INDEX[loan_id.lower()] = loan_id
+        if txid:
+            loan_ids = _TXID_INDEX.setdefault(txid.lower(), [])
+            if loan_id not in loan_ids:
+                loan_ids.append(loan_id)
+
+
+register_loan_publish_listener(index_loan)
+
+
+def _lookup_loan_index(query: str) -> Optional[str]:
+    """
+    Resolve a loan_id / txid (exact or partial) from the in-memory index.
+    A txid shared by a publishmulti batch resolves to its first loan.
+    """
+    q = query.lower()
+    with _INDEX_LOCK:
+        hit = _LOAN_ID_INDEX.get(q)
+        if hit:
+            return hit
+        loan_ids = _TXID_INDEX.get(q)
+        if loan_ids:
+            return loan_ids[0]
+        for key, lid in _LOAN_ID_INDEX.items():
+            if q in key:
+                return lid
+        for key, loan_ids in _TXID_INDEX.items():
+            if q in key:
+                return loan_ids[0]
+    return None
+
+
+def _indexed_loan_id(query: str) -> Optional[str]:
+    """Exact (case-insensitive) loan_id hit in the index, key prefix optional."""
+    q = query.lower()
+    if q.startswith(LOAN_KEY_PREFIX):
+        q = q[len(LOAN_KEY_PREFIX):]
+    with _INDEX_LOCK:
+        return _LOAN_ID_INDEX.get(q)
+
+
+async def _index_rules_out(query: str) -> bool:
+    """
+    True when the index is complete and *query* matches no loan, meaning
+    every RPC strategy in verify_loan_public would come back empty.
+    Raw hex queries are never ruled out: they may be non-loan transactions.
+    The index is per-process and only sees this worker's publishes, so the
+    count is always read fresh (never LOAN_COUNT_KEY) before trusting a miss.
+    """
+    with _INDEX_LOCK:
+        coverage = _index_coverage
+    if not coverage or _HEX_RE.fullmatch(query):
+        return False
+    total = await _run_blocking(get_stream_item_count, "loan_storage")
+    if total is None:
+        return False
+    set_cached(LOAN_COUNT_KEY, total, STATS_TTL)
+    if total != coverage:
+        return False
+    bare = query[len(LOAN_KEY_PREFIX):] if query.lower().startswith(LOAN_KEY_PREFIX) else query
+    return _lookup_loan_index(bare) is None
+
+
+# Parsed stream payloads keyed by (txid, vout, stream keys). Confirmed stream
+# items never change, so repeated views of the same loan skip hex + JSON decode.
+_PARSE_CACHE_MAX = 4096
+_parse_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+
+def _parse_cache_key(item: dict) -> Optional[tuple]:
+    """
+    Identity of a stream item for the parse cache, or None to skip caching.
+    A publishmulti batch shares one txid, and non-verbose reads may omit
+    vout, so the item's stream key(s) are part of the identity. Items with
+    neither vout nor a key can't be told apart and aren't cached.
+    """
+    txid = item.get("txid")
+    if not txid:
+        return None
+    keys = item.get("keys")
+    stream_key = tuple(keys) if isinstance(keys, list) else item.get("key")
+    vout = item.get("vout")
+    if vout is None and not stream_key:
+        return None
+    return (txid, vout, stream_key)
+
+
+def _loads_hex(raw: str) -> dict:
+    """Hex → JSON in one pass when orjson is available (it parses bytes directly)."""
+    if orjson is not None:
+        return orjson.loads(bytes.fromhex(raw))
+    return json.loads(bytes.fromhex(raw).decode("utf-8"))
 
 
 def _parse_multichain_data(item: dict) -> dict:
@@ -19,9 +262,55 @@ def _parse_multichain_data(item: dict) -> dict:
     Parse data from a MultiChain stream item.
     MultiChain returns hex-encoded data when published as raw hex,
     or {"json": {...}} when published as JSON objects.
+    Results are memoized per stream item (see _parse_cache_key).
     """
-    raw = item.get("data", {})
-    
+    key = _parse_cache_key(item)
+    if key is None:
+        return _decode_multichain_data(item.get("data", {}))
+
+    with _parse_cache_lock:
+        cached = _parse_cache.get(key)
+        if cached is not None:
+            _parse_cache.move_to_end(key)
+            return cached
+
+    parsed = _decode_multichain_data(item.get("data", {}))
+    with _parse_cache_lock:
+        _parse_cache[key] = parsed
+        if len(_parse_cache) > _PARSE_CACHE_MAX:
+            _parse_cache.popitem(last=False)
+    return parsed
+
+
+def _parse_multichain_items(items: list) -> list:
+    """
+    Batch form of _parse_multichain_data for list endpoints.
+    Takes the cache lock once for all lookups and once for all inserts,
+    and decodes only the misses in between.
+    """
+    keys = [_parse_cache_key(item) for item in items]
+    with _parse_cache_lock:
+        parsed = [_parse_cache.get(key) if key is not None else None for key in keys]
+
+    decoded = {}
+    for i, item in enumerate(items):
+        if parsed[i] is None:
+            parsed[i] = _decode_multichain_data(item.get("data", {}))
+            if keys[i] is not None:
+                decoded[keys[i]] = parsed[i]
+
+    with _parse_cache_lock:
+        for key in keys:
+            if key is not None and key in _parse_cache:
+                _parse_cache.move_to_end(key)
+        _parse_cache.update(decoded)
+        while len(_parse_cache) > _PARSE_CACHE_MAX:
+            _parse_cache.popitem(last=False)
+    return parsed
+
+
+def _decode_multichain_data(raw) -> dict:
+    """Decode the raw 'data' field of a stream item (uncached)."""
     # Case 1: Already a dict with 'json' key (MultiChain JSON format)
     if isinstance(raw, dict):
         json_val = raw.get("json")
@@ -37,9 +326,9 @@ def _parse_multichain_data(item: dict) -> dict:
     # Case 2: Hex-encoded string (our publish format)
     if isinstance(raw, str):
         try:
-            decoded = bytes.fromhex(raw).decode("utf-8")
-            return json.loads(decoded)
-        except (ValueError, UnicodeDecodeError, json.JSONDecodeError):
+            return _loads_hex(raw)
+        except (ValueError, UnicodeDecodeError):
+            # orjson.JSONDecodeError and json.JSONDecodeError are ValueErrors
             pass
         # Try plain JSON
         try:
@@ -51,39 +340,46 @@ def _parse_multichain_data(item: dict) -> dict:
 
 
 @router.get("/explore/platform-stats")
-async def get_platform_stats():
+async def get_platform_stats(request: Request):
     """
     Get public platform statistics (Members, Loans, Repayments)
     """
+    return _conditional_json(request, await _platform_stats(), STATS_CACHE_CONTROL)
+
+
+async def _platform_stats():
+    cached = get_cached(PLATFORM_STATS_KEY)
+    if cached is not None:
+        return cached
+
     try:
         # Fetch data from DB
-        kyc_records = get_all_items("kyc")
-        loans = get_all_items("loans")
+        kyc_records = await _run_blocking(get_all_items, "kyc")
+        loan_stats = await _run_blocking(get_loan_stats_aggregate)
         
-        # 1. Verified Members
-        verified_count = sum(1 for k in kyc_records.values() if k.get("status") == "VERIFIED")
+        # 1. Verified Members + 4. Communities Served (unique districts) — one pass
+        verified_count = 0
+        districts = set()
+        for k in kyc_records.values():
+            if k.get("status") == "VERIFIED":
+                verified_count += 1
+            districts.add(k.get("address", {}).get("district", "Unknown"))
         
-        # 2. Loans Facilitated (Total Amount)
-        total_loan_amount = sum(float(l.get("amount", 0)) for l in loans.values() if l.get("status") in ["ACTIVE", "REPAID", "APPROVED"])
+        # 2. Loans Facilitated (Total Amount) + 3. Repaid / Active counts — aggregated in SQL
+        total_loan_amount = loan_stats["total_amount"]
+        repaid_loans = loan_stats["repaid"]
+        active_loans = loan_stats["active"]
         
         # 3. Successful Repayments % (Mock logic or real if data available)
         # Using simple ratio of REPAID loans vs Total Disbursed for now
-        repaid_loans = sum(1 for l in loans.values() if l.get("status") == "REPAID")
-        active_loans = sum(1 for l in loans.values() if l.get("status") in ["ACTIVE", "REPAID"])
         repayment_rate = (repaid_loans / active_loans * 100) if active_loans > 0 else 98.5 # Default to high if no data
-
-        # 4. Communities Served (Unique districts)
-        districts = set()
-        for k in kyc_records.values():
-            addr = k.get("address", {})
-            districts.add(addr.get("district", "Unknown"))
         
-        return {
+        return set_cached(PLATFORM_STATS_KEY, {
             "verified_members": verified_count if verified_count > 0 else 1024, # Fallback for demo if empty
             "loans_amount": total_loan_amount if total_loan_amount > 0 else 50000000,
             "repayment_rate": round(repayment_rate, 1),
             "communities": len(districts) if len(districts) > 0 else 12
-        }
+        }, STATS_TTL)
     except Exception as e:
         print(f"Stats Error: {e}")
         return {
@@ -99,18 +395,25 @@ async def get_blockchain_stats():
     """
     Get real-time blockchain network statistics and recent blocks
     """
+    cached = get_cached(BLOCKCHAIN_STATS_KEY)
+    if cached is not None:
+        return cached
+
     try:
-        # 1. Get General Info
-        info = call_rpc("getinfo")
+        # 1+2. General info and recent blocks in one batched round-trip.
+        # listblocks "-6" = the last 6 blocks (tip-5 .. tip) relative to the tip.
+        batch = await _run_blocking(call_rpc_batch, [("getinfo", []), ("listblocks", ["-6"])])
+        info, blocks_data = batch if batch else (None, None)
         
         if not info:
             # MultiChain not available — return empty fallback
             return {"stats": {}, "recent_blocks": []}
         
-        # 2. Get Recent Blocks (last 5)
-        tip = info.get("blocks", 0)
-        start_block = max(0, tip - 5)
-        blocks_data = call_rpc("listblocks", [f"{start_block}-{tip}"])
+        if not isinstance(blocks_data, list):
+            # Node rejected the tip-relative range; fall back to explicit heights
+            tip = info.get("blocks", 0)
+            start_block = max(0, tip - 5)
+            blocks_data = await _run_blocking(call_rpc, "listblocks", [f"{start_block}-{tip}"])
         
         # Process blocks to be friendly for frontend
         formatted_blocks = []
@@ -120,11 +423,11 @@ async def get_blockchain_stats():
                     "id": block.get("height"),
                     "hash": block.get("hash"),
                     "txs": block.get("txn_count", 0),
-                    "time": datetime.fromtimestamp(block.get("time")).strftime("%H:%M:%S"),
+                    "time": _hms(block.get("time")),
                     "miner": block.get("miner", "N/A")
                 })
 
-        return {
+        return set_cached(BLOCKCHAIN_STATS_KEY, {
             "stats": {
                 "blocks": info.get("blocks"),
                 "connections": info.get("connections"),
@@ -133,24 +436,82 @@ async def get_blockchain_stats():
                 "is_mining": info.get("mining", False)
             },
             "recent_blocks": formatted_blocks
-        }
+        }, RECENT_BLOCKS_TTL)
     except Exception as e:
         print(f"Error fetching stats: {e}")
         # Return fallback if RPC is down (so UI doesn't crash)
         return {"stats": {}, "recent_blocks": []}
 
 
+def _format_stream_loan(item: dict, loan_data: dict) -> dict:
+    loan_get = loan_data.get
+    item_get = item.get
+    publishers = item_get("publishers")
+    return {
+        "loan_id": loan_get("loan_id"),
+        "loan_hash": loan_get("loan_hash"),
+        "borrower": loan_get("borrower"),
+        "lender": loan_get("lender"),
+        "timestamp": loan_get("timestamp"),
+        "is_repaid": loan_get("is_repaid", False),
+        "transaction_hash": item_get("txid"),
+        "confirmations": item_get("confirmations", 0),
+        "block_time": item_get("blocktime"),
+        "publisher": publishers[0] if publishers else None
+    }
+
+
+def _format_stream_loans(items: list) -> list:
+    """Decode and format a page of stream items (runs on the RPC pool)."""
+    return [
+        _format_stream_loan(item, loan_data)
+        for item, loan_data in zip(items, _parse_multichain_items(items))
+    ]
+
+
 @router.get("/explore/loans")
 async def get_all_blockchain_loans(
+    request: Request,
     limit: int = Query(50, le=100),
     offset: int = Query(0, ge=0)
 ):
     """
     Public endpoint: Get all loans stored on blockchain
     No authentication required - for transparency
+    Only the requested window is fetched from the stream (newest first).
     """
+    body = await _blockchain_loans(limit, offset)
+    return _conditional_json(request, body, STATS_CACHE_CONTROL, memo=False)
+
+
+async def _blockchain_loans(limit: int, offset: int):
     try:
-        items = get_stream_items("loan_storage")
+        total = get_cached(LOAN_COUNT_KEY)
+        if total is None:
+            total = await _run_blocking(get_stream_item_count, "loan_storage")
+            if total is not None:
+                set_cached(LOAN_COUNT_KEY, total, STATS_TTL)
+
+        if total is not None:
+            # Stream is oldest-first: page N from the end is [total-offset-limit, total-offset)
+            end = max(0, total - offset)
+            start = max(0, end - limit)
+            window = []
+            if end > start:
+                window = await _run_blocking(get_stream_items, "loan_storage", end - start, start)
+            window.reverse()
+            formatted_loans = await _run_blocking(_format_stream_loans, window)
+            return {
+                "success": True,
+                "total": total,
+                "count": len(formatted_loans),
+                "offset": offset,
+                "limit": limit,
+                "loans": formatted_loans
+            }
+
+        # Stream count unavailable — fetch everything and slice
+        items = await _run_blocking(get_stream_items, "loan_storage")
         
         # Sort by most recent first
         if isinstance(items, list):
@@ -160,22 +521,7 @@ async def get_all_blockchain_loans(
             paginated_items = items[offset:offset + limit]
             
             # Parse and format data
-            formatted_loans = []
-            for item in paginated_items:
-                loan_data = _parse_multichain_data(item)
-                
-                formatted_loans.append({
-                    "loan_id": loan_data.get("loan_id"),
-                    "loan_hash": loan_data.get("loan_hash"),
-                    "borrower": loan_data.get("borrower"),
-                    "lender": loan_data.get("lender"),
-                    "timestamp": loan_data.get("timestamp"),
-                    "is_repaid": loan_data.get("is_repaid", False),
-                    "transaction_hash": item.get("txid"),
-                    "confirmations": item.get("confirmations", 0),
-                    "block_time": item.get("blocktime"),
-                    "publisher": item.get("publishers", [])[0] if item.get("publishers") else None
-                })
+            formatted_loans = await _run_blocking(_format_stream_loans, paginated_items)
             
             return {
                 "success": True,
@@ -194,35 +540,66 @@ async def get_all_blockchain_loans(
 
 
 @router.get("/explore/loan/{loan_id}")
-async def verify_loan_public(loan_id: str):
+async def verify_loan_public(loan_id: str, request: Request):
     """
     Public endpoint: Verify any loan by ID, TX hash, or search query.
     Supports: loan ID (LN-xxxx), full TX hash, partial hash
+    Successful lookups are cached per (resolved loan_id, tip // 10), or per
+    txid for non-loan transactions; 404s are not, so newly-published loans
+    appear immediately.
+    Browser max-age grows with confirmations (unconfirmed: no-cache).
     """
+    body = await _verify_loan(loan_id)
+    confirmations = body["verification"]["confirmations"] or 0
+    max_age = min(confirmations * LOAN_MAX_AGE_PER_CONFIRMATION, LOAN_MAX_AGE)
+    cache_control = f"public, max-age={max_age}" if max_age else "no-cache"
+    return _conditional_json(request, body, cache_control)
+
+
+async def _verify_loan(loan_id: str):
+    global _index_coverage
     try:
         query = loan_id.strip()
+        bucket = (await _run_blocking(_chain_tip)) // 10
+        # Keyed on what the query resolves to, never the raw query, so
+        # arbitrary partial matches can't each add a cache entry.
+        if _HEX_RE.fullmatch(query):
+            tx_cache_key = f"loanv:tx:{query.lower()}:{bucket}"
+            cached = get_cached(tx_cache_key)
+        else:
+            known_id = _indexed_loan_id(query)
+            cached = get_cached(f"loanv:{known_id}:{bucket}") if known_id else None
+        if cached is not None:
+            return cached
+
+        if await _index_rules_out(query):
+            raise HTTPException(status_code=404, detail="Loan not found on blockchain")
+
         items = None
         latest = None
         loan_data = {}
 
         # Strategy 1: Try as loan ID directly
-        items = get_stream_key_items("loan_storage", f"loan_{query}")
-        
         # Strategy 2: If not found, try without "loan_" prefix (user may have typed full key)
-        if not items:
-            items = get_stream_key_items("loan_storage", query)
+        # Both lookups go out as a single batched RPC.
+        key_batch = await _run_blocking(call_rpc_batch, [
+            # verbose=false, count=1, start=-1: only the latest item per key
+            ("liststreamkeyitems", ["loan_storage", LOAN_KEY_PREFIX + query, False, 1, -1]),
+            ("liststreamkeyitems", ["loan_storage", query, False, 1, -1]),
+        ]) or [None, None]
+        items = key_batch[0] or key_batch[1]
         
         # Strategy 3: If looks like a TX hash (64 hex chars), look it up
-        if not items and len(query) >= 32 and all(c in '0123456789abcdefABCDEF' for c in query):
+        if not items and _HEX_RE.fullmatch(query):
             try:
-                tx_detail = call_rpc("getrawtransaction", [query, 1])
+                tx_detail = await _run_blocking(call_rpc, "getrawtransaction", [query, 1])
                 if tx_detail:
-                    return {
+                    return set_cached(tx_cache_key, {
                         "success": True,
                         "loan_id": query,
                         "blockchain_proof": {
                             "transaction_hash": query,
-                            "stored_at": datetime.fromtimestamp(tx_detail.get("time", 0)).isoformat() if tx_detail.get("time") else None,
+                            "stored_at": _iso(tx_detail.get("time")),
                             "confirmations": tx_detail.get("confirmations", 0),
                             "block_time": tx_detail.get("blocktime"),
                             "is_repaid": False,
@@ -235,20 +612,30 @@ async def verify_loan_public(loan_id: str):
                             "publicly_verifiable": True,
                             "confirmations": tx_detail.get("confirmations", 0)
                         }
-                    }
+                    }, LOAN_VERIFY_TTL)
             except Exception:
                 pass
         
-        # Strategy 4: Scan all items for a partial match
+        # Strategy 4: Partial match — index first, full stream scan as fallback
+        if not items:
+            indexed_id = _lookup_loan_index(query)
+            if indexed_id:
+                items = await _run_blocking(get_stream_key_items, "loan_storage", LOAN_KEY_PREFIX + indexed_id, 1, -1)
+
         if not items:
-            all_items = get_stream_items("loan_storage")
+            all_items = await _run_blocking(get_stream_items, "loan_storage")
             if isinstance(all_items, list):
                 for item in all_items:
                     parsed = _parse_multichain_data(item)
                     lid = parsed.get("loan_id", "")
+                    index_loan(lid, item.get("txid"))
                     if query.lower() in lid.lower() or query.lower() in (item.get("txid") or "").lower():
                         items = [item]
                         break
+                else:
+                    # Walked the whole stream, so the index now covers it
+                    with _INDEX_LOCK:
+                        _index_coverage = len(all_items)
         
         if not items:
             raise HTTPException(status_code=404, detail="Loan not found on blockchain")
@@ -260,12 +647,12 @@ async def verify_loan_public(loan_id: str):
         repayment_items = []
         found_loan_id = loan_data.get("loan_id", query)
         try:
-            repayment_items = get_stream_key_items("loan_repayments", f"repayment_{found_loan_id}") or []
+            repayment_items = await _run_blocking(get_stream_key_items, "loan_repayments", REPAYMENT_KEY_PREFIX + str(found_loan_id), 1, -1) or []
         except Exception:
             pass
         is_repaid_on_chain = bool(repayment_items)
         
-        return {
+        return set_cached(f"loanv:{found_loan_id}:{bucket}", {
             "success": True,
             "loan_id": found_loan_id,
             "blockchain_proof": {
@@ -285,7 +672,7 @@ async def verify_loan_public(loan_id: str):
                 "publicly_verifiable": True,
                 "confirmations": latest.get("confirmations", 0)
             }
-        }
+        }, LOAN_VERIFY_TTL)
         
     except HTTPException:
         raise
@@ -294,14 +681,22 @@ async def verify_loan_public(loan_id: str):
 
 
 @router.get("/explore/loan-stats")
-async def get_blockchain_loan_stats():
+async def get_blockchain_loan_stats(request: Request):
     """
     Public endpoint: Get blockchain loan statistics
     """
+    return _conditional_json(request, await _blockchain_loan_stats(), STATS_CACHE_CONTROL)
+
+
+async def _blockchain_loan_stats():
+    cached = get_cached(LOAN_STATS_KEY)
+    if cached is not None:
+        return cached
+
     try:
         # Get all loans
-        loan_items = get_stream_items("loan_storage")
-        repayment_items = get_stream_items("loan_repayments")
+        loan_items = await _run_blocking(get_stream_items, "loan_storage")
+        repayment_items = await _run_blocking(get_stream_items, "loan_repayments")
         
         total_loans = len(loan_items) if isinstance(loan_items, list) else 0
         total_repayments = len(repayment_items) if isinstance(repayment_items, list) else 0
@@ -310,14 +705,14 @@ async def get_blockchain_loan_stats():
         repayment_rate = (total_repayments / total_loans * 100) if total_loans > 0 else 0
         
         # Get recent activity (last 24 hours)
-        current_time = datetime.utcnow().timestamp()
+        current_time = time.time()
         recent_loans = 0
         if isinstance(loan_items, list):
             for item in loan_items:
                 if item.get('blocktime', 0) > current_time - 86400:
                     recent_loans += 1
         
-        return {
+        return set_cached(LOAN_STATS_KEY, {
             "success": True,
             "statistics": {
                 "total_loans_on_chain": total_loans,
@@ -332,7 +727,7 @@ async def get_blockchain_loan_stats():
                 "immutable_records": True,
                 "no_authentication_required": True
             }
-        }
+        }, STATS_TTL)
         
     except Exception as e:
         print(f"Error fetching loan stats: {e}")
@@ -358,15 +753,21 @@ async def get_blockchain_loan_stats():
 async def get_transaction_details(txid: str):
     """
     Public endpoint: Get transaction details by hash
+    Cached for 24h once the transaction is past TX_FINAL_CONFIRMATIONS.
     """
+    cache_key = f"tx:{txid}"
+    cached = get_cached(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         # Use getrawtransaction with verbose=1 to get decoded details
-        tx_info = call_rpc("getrawtransaction", [txid, 1])
+        tx_info = await _run_blocking(call_rpc, "getrawtransaction", [txid, 1])
         
         if not tx_info:
             raise HTTPException(status_code=404, detail="Transaction not found")
         
-        return {
+        response = {
             "success": True,
             "transaction_hash": txid,
             "confirmations": tx_info.get("confirmations", 0),
@@ -379,6 +780,9 @@ async def get_transaction_details(txid: str):
                 "vin_count": len(tx_info.get("vin", [])),
             }
         }
+        if response["confirmations"] >= TX_FINAL_CONFIRMATIONS:
+            set_cached(cache_key, response, TX_DETAILS_TTL)
+        return response
         
     except HTTPException:
         raise
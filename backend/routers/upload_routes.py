@@ -1,7 +1,7 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
-import shutil
 import os
-import uuid
+
+from utils.upload_utils import MAX_VIDEO_BYTES, save_upload
 
 router = APIRouter(tags=["upload"])
 
@@ -15,17 +15,16 @@ print(f"[UPLOAD] Upload directory: {UPLOAD_DIR}")
 @router.post("/upload")
 async def upload_file(file: UploadFile = File(...)):
     try:
-        # Generate unique filename
-        ext = file.filename.split(".")[-1]
-        filename = f"{uuid.uuid4()}.{ext}"
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Stream to a uniquely named file without blocking the event loop
+        # /upload also carries loan verification videos, so use the video cap
+        file_path = await save_upload(file, UPLOAD_DIR, MAX_VIDEO_BYTES)
+        filename = os.path.basename(file_path)
         
         print(f"[UPLOAD] Saved: {file_path} ({os.path.getsize(file_path)} bytes, exists={os.path.isfile(file_path)})")
             
         # Return a browser-accessible URL (FastAPI serves /static from backend/static)
         return {"url": f"/static/uploads/{filename}", "filename": filename}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,31 @@
+import os
+from urllib.parse import urlparse
+
+
+# backend/static/uploads — where /upload writes and /static serves from
+_STATIC_UPLOADS = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'static', 'uploads'))
+_UPLOAD_PREFIXES = ('/static/uploads/', 'static/uploads/')
+
+
+def resolve_upload_ref(ref: str) -> str:
+    """Resolve frontend-provided refs (e.g. '/static/uploads/x.png' or full URLs) to local disk paths.
+
+    The AI pipeline expects filesystem paths. The upload API returns browser URLs under /static/uploads.
+    """
+    if not ref:
+        return ref
+
+    text = str(ref).strip().replace('\\', '/')
+    # If it's a full URL, extract only the path portion
+    if text.startswith(('http://', 'https://')):
+        try:
+            text = urlparse(text).path or text
+        except ValueError:
+            pass
+
+    for prefix in _UPLOAD_PREFIXES:
+        if text.startswith(prefix):
+            return os.path.join(_STATIC_UPLOADS, text[len(prefix):])
+
+    # Already a filesystem path or non-static reference
+    return ref
@@ -10,7 +10,7 @@ def _get_blockchain_hash(stream: str, key: str):
     """
     Fetch latest hash value for a key from a stream
     """
-    items = get_stream_key_items(stream, key)
+    items = get_stream_key_items(stream, key, count=1, start=-1)
     if not items:
         return None
     return items[-1]["data"]
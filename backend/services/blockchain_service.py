@@ -11,14 +11,31 @@ This service handles:
 
 import os
 import json
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 import hashlib
-from typing import Dict, Optional, Tuple, List
-from datetime import datetime
+import ssl
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple, List
+import time
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import your existing MultiChain code
-from multichain_rpc import publish_to_stream, get_stream_key_items, create_stream
-from blockchain.utils import sha256_hash
+from multichain_rpc import (
+    RPC_TIMEOUT,
+    MultiChainRPCError,
+    publish_to_stream,
+    publish_multi_to_stream,
+    get_stream_key_items,
+    create_stream,
+    stream_exists,
+)
 
 logger = logging.getLogger("artha.blockchain")
 
@@ -26,6 +43,228 @@ logger = logging.getLogger("artha.blockchain")
 LOAN_STORAGE_STREAM = "loan_storage"
 LOAN_REPAYMENT_STREAM = "loan_repayments"
 
+# Stream item keys are "<prefix><loan_id>"; shared with the public explorer
+LOAN_KEY_PREFIX = "loan_"
+REPAYMENT_KEY_PREFIX = "repayment_"
+
+# Set once both streams are known to exist, so later BlockchainService
+# instances (reloads, scripts) skip the liststreams/create RPCs.
+_STREAMS_ENSURED = False
+
+# Callbacks fired as fn(loan_id, txid) after a loan is published to
+# LOAN_STORAGE_STREAM (e.g. the public explorer's lookup index).
+_loan_publish_listeners: List[Callable[[str, str], None]] = []
+
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") — swapped as one tuple so
+# concurrent publishers never pair a second with another second's prefix.
+_iso_cache: Tuple[int, str] = (-1, "")
+
+
+def _utc_iso_now() -> str:
+    """
+    Same string as datetime.utcnow().isoformat(), without building a
+    datetime; the date/time prefix is formatted once per second.
+    """
+    global _iso_cache
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+    cached_sec, prefix = _iso_cache
+    if cached_sec != sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _iso_cache = (sec, prefix)
+    us = ns // 1000
+    return f"{prefix}.{us:06d}" if us else prefix
+
+
+def _canonicalize(data: Dict) -> bytes:
+    """
+    Canonical JSON bytes: sorted keys, compact separators, ASCII-escaped.
+    Byte-identical to blockchain.utils.sha256_hash's input, so hashes
+    already stored on chain keep verifying.
+    """
+    # ensure_ascii output, so the ASCII codec is exact (and cheaper than UTF-8)
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("ascii")
+
+
+@lru_cache(maxsize=4096)
+def _hash_canonical(canonical: bytes) -> str:
+    """SHA256 of already-canonical JSON bytes (memoized across retries/re-checks)."""
+    return hashlib.sha256(canonical).hexdigest()
+
+
+def _encode_stream_payload(data: Dict) -> str:
+    """
+    _canonicalize(data), hex-encoded for MultiChain publish, so a payload
+    and its hash always come from the same bytes.
+    bytes.hex() is CPython's C encoder; it benchmarks ahead of
+    binascii.b2a_hex(...).decode() for our ~300 byte payloads.
+    """
+    return _canonicalize(data).hex()
+
+
+# Publishes are group-committed: whatever queued up while the previous RPC
+# was in flight goes out as one publishmulti, so an idle server adds no delay.
+PUBLISH_BATCH_MAX = 64
+PUBLISH_TIMEOUT = 15  # seconds a caller waits before giving up on a queued publish
+
+
+class _PendingPublish:
+    """One queued publish. in_flight / abandoned are guarded by the publisher's lock."""
+
+    __slots__ = ("stream", "key", "hex_data", "future", "in_flight", "abandoned")
+
+    def __init__(self, stream: str, key: str, hex_data: str):
+        self.stream = stream
+        self.key = key
+        self.hex_data = hex_data
+        self.future: Future = Future()
+        self.in_flight = False
+        self.abandoned = False
+
+
+class _StreamPublisher:
+    """
+    Background thread that drains queued publishes into publishmulti calls.
+
+    A caller that times out abandons its item, and abandoned items are never
+    sent. If an RPC carrying the item is already running, the caller waits
+    for that RPC instead, so "failed" is never reported for an item that
+    then lands on chain (a retry would publish a duplicate).
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[_PendingPublish]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+    def submit(self, stream: str, key: str, hex_data: str) -> _PendingPublish:
+        pending = _PendingPublish(stream, key, hex_data)
+        self._queue.put(pending)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="multichain-publisher", daemon=True
+                    )
+                    self._thread.start()
+        return pending
+
+    def wait(self, pending: _PendingPublish, timeout: float) -> str:
+        """Return *pending*'s txid, or abandon it and raise TimeoutError."""
+        try:
+            return pending.future.result(timeout=timeout)
+        except FutureTimeout:
+            pass
+        while True:
+            with self._state_lock:
+                if pending.future.done():
+                    break
+                if not pending.in_flight:
+                    pending.abandoned = True
+                    raise TimeoutError(f"Publish to '{pending.stream}' timed out after {timeout}s")
+            # An RPC carrying this item is running; let it finish
+            try:
+                return pending.future.result(timeout=RPC_TIMEOUT)
+            except FutureTimeout:
+                continue
+        return pending.future.result()
+
+    def _claim(self, entries: List[_PendingPublish]) -> List[_PendingPublish]:
+        """Mark the not-abandoned *entries* in flight and return them."""
+        with self._state_lock:
+            live = [p for p in entries if not p.abandoned]
+            for p in live:
+                p.in_flight = True
+        return live
+
+    def _release(self, entries: List[_PendingPublish]):
+        with self._state_lock:
+            for p in entries:
+                p.in_flight = False
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < PUBLISH_BATCH_MAX:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            by_stream: Dict[str, List[_PendingPublish]] = {}
+            for pending in batch:
+                by_stream.setdefault(pending.stream, []).append(pending)
+            for stream, entries in by_stream.items():
+                self._flush(stream, entries)
+
+    def _flush(self, stream: str, entries: List[_PendingPublish]):
+        live = self._claim(entries)
+        if len(live) > 1:
+            try:
+                txid = publish_multi_to_stream(stream, [(p.key, p.hex_data) for p in live])
+                for p in live:
+                    p.future.set_result(txid)
+                logger.info(f"Published {len(live)} items to '{stream}' in one publishmulti: {txid}")
+                return
+            except MultiChainRPCError as e:
+                # The node rejected the tx (one bad item fails it all), so
+                # nothing landed; retry individually below
+                logger.warning(f"publishmulti to '{stream}' rejected, publishing one by one: {e}")
+            except Exception as e:
+                # Timeout / unreachable node: the tx may still have landed,
+                # and republishing could duplicate every item in it
+                logger.error(f"publishmulti to '{stream}' failed: {e}")
+                for p in live:
+                    p.future.set_exception(e)
+                return
+            finally:
+                self._release(live)
+        else:
+            self._release(live)
+
+        for pending in entries:
+            if not self._claim([pending]):
+                continue
+            try:
+                pending.future.set_result(publish_to_stream(stream, pending.key, pending.hex_data))
+            except Exception as e:
+                pending.future.set_exception(e)
+            finally:
+                self._release([pending])
+
+
+_publisher = _StreamPublisher()
+
+
+def register_loan_publish_listener(fn: Callable[[str, str], None]):
+    """Register *fn(loan_id, txid)* to run after every successful loan publish."""
+    _loan_publish_listeners.append(fn)
+
+
+def _ensure_streams():
+    """Create the loan streams if missing (checked once per process)."""
+    global _STREAMS_ENSURED
+    if _STREAMS_ENSURED:
+        return
+
+    ensured = True
+    for stream in (LOAN_STORAGE_STREAM, LOAN_REPAYMENT_STREAM):
+        exists = stream_exists(stream)
+        if exists is None:
+            logger.warning(f"MultiChain unreachable; stream '{stream}' not checked")
+            ensured = False
+        elif exists:
+            logger.info(f"Stream '{stream}' ready")
+        else:
+            try:
+                create_stream(stream, open_stream=True)
+                logger.info(f"Stream '{stream}' created")
+            except Exception as e:
+                logger.error(f"Failed to create stream '{stream}': {e}")
+                ensured = False
+    _STREAMS_ENSURED = ensured
+
 
 class BlockchainService:
     """
@@ -34,23 +273,18 @@ class BlockchainService:
     """
     
     def __init__(self):
-        # Ensure streams exist
-        try:
-            create_stream(LOAN_STORAGE_STREAM, open_stream=True)
-            logger.info(f"Stream '{LOAN_STORAGE_STREAM}' ready")
-        except Exception as e:
-            logger.info(f"Stream '{LOAN_STORAGE_STREAM}' already exists or created")
-        
-        try:
-            create_stream(LOAN_REPAYMENT_STREAM, open_stream=True)
-            logger.info(f"Stream '{LOAN_REPAYMENT_STREAM}' ready")
-        except Exception as e:
-            logger.info(f"Stream '{LOAN_REPAYMENT_STREAM}' already exists or created")
+        # hashlib.sha256 is OpenSSL-backed (SHA-NI where the CPU has it)
+        # whenever OpenSSL provides it; log which build we're hashing with.
+        if "sha256" in hashlib.algorithms_available:
+            logger.info(f"SHA256 provided by {ssl.OPENSSL_VERSION}")
+
+        _ensure_streams()
     
     def _generate_loan_hash(self, loan_data: Dict) -> str:
         """
         Generate SHA256 hash of loan data for blockchain storage
-        Uses your existing hash utility
+        Same canonical form as blockchain.utils.sha256_hash, so hashes
+        already on chain still verify; the digest is memoized on it.
         
         Args:
             loan_data: Dictionary containing loan details
@@ -58,7 +292,7 @@ class BlockchainService:
         Returns:
             Hexadecimal hash string
         """
-        return sha256_hash(loan_data)
+        return _hash_canonical(_canonicalize(loan_data))
     
     def _publish_to_multichain(self, stream: str, key: str, data: Dict) -> str:
         """
@@ -74,11 +308,10 @@ class BlockchainService:
         """
         try:
             # Convert data to JSON, then hex-encode for MultiChain
-            json_data = json.dumps(data, sort_keys=True)
-            hex_data = json_data.encode("utf-8").hex()
+            hex_data = _encode_stream_payload(data)
             
-            # Publish using your existing multichain_rpc
-            txid = publish_to_stream(stream, key, hex_data)
+            # Queue for the batching publisher and wait for our txid
+            txid = _publisher.wait(_publisher.submit(stream, key, hex_data), PUBLISH_TIMEOUT)
             
             logger.info(f"Published to MultiChain stream '{stream}' with key '{key}': {txid}")
             return txid
@@ -119,18 +352,23 @@ class BlockchainService:
                 "loan_hash": loan_hash,
                 "borrower": borrower_address or loan_data.get("borrower_phone", ""),
                 "lender": lender_address or loan_data.get("lender_phone", ""),
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": _utc_iso_now(),
                 "is_repaid": False
             }
             
             # Publish to loan_storage stream using loan_id as key
             tx_hash = self._publish_to_multichain(
                 LOAN_STORAGE_STREAM,
-                f"loan_{loan_id}",
+                LOAN_KEY_PREFIX + loan_id,
                 blockchain_data
             )
             
             logger.info(f"Loan {loan_id} stored on MultiChain. TX: {tx_hash}")
+            for listener in _loan_publish_listeners:
+                try:
+                    listener(loan_id, tx_hash)
+                except Exception as e:
+                    logger.warning(f"Loan publish listener failed: {e}")
             return True, tx_hash, None
             
         except Exception as e:
@@ -162,14 +400,14 @@ class BlockchainService:
                 "loan_id": loan_id,
                 "repayment_amount": repayment_amount,
                 "borrower": borrower_address or "",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": _utc_iso_now(),
                 "status": "FULLY_REPAID"
             }
             
             # Publish to loan_repayments stream
             tx_hash = self._publish_to_multichain(
                 LOAN_REPAYMENT_STREAM,
-                f"repayment_{loan_id}",
+                REPAYMENT_KEY_PREFIX + loan_id,
                 repayment_data
             )
             
@@ -194,13 +432,12 @@ class BlockchainService:
         logger.info(f"Retrieving loan {loan_id} from MultiChain")
         
         try:
-            # Get items from loan_storage stream with this key
-            items = get_stream_key_items(LOAN_STORAGE_STREAM, f"loan_{loan_id}")
+            # Only the latest item under this key is needed
+            items = get_stream_key_items(LOAN_STORAGE_STREAM, LOAN_KEY_PREFIX + loan_id, count=1, start=-1)
             
             if not items:
                 return False, None, "Loan not found on blockchain"
             
-            # Get the latest item (should be only one)
             latest_item = items[-1] if isinstance(items, list) else items
             
             # Parse the data
@@ -209,7 +446,10 @@ class BlockchainService:
                 if isinstance(loan_data, str):
                     # Try hex-decode first, then JSON parse
                     try:
-                        loan_data = json.loads(bytes.fromhex(loan_data).decode("utf-8"))
+                        if orjson is not None:
+                            loan_data = orjson.loads(bytes.fromhex(loan_data))
+                        else:
+                            loan_data = json.loads(bytes.fromhex(loan_data).decode("utf-8"))
                     except (ValueError, UnicodeDecodeError):
                         loan_data = json.loads(loan_data)
                 return True, loan_data, None
@@ -7,43 +7,17 @@ from schemas.kyc_schemas import (
 from blockchain.kyc import record_kyc_result
 from blockchain.identity import record_identity_proof
 
-from models.citizenship_ocr_model import verify_citizenship_card
+from models.citizenship_ocr_model import verify_citizenship_card, extract_thumbprint, detect_face_on_card
+from services.sanctions_screening_service import screen_individual
 
 from db.database import get_item, put_item
+from db.writer import enqueue_put, flush as flush_writes
 
+import logging
 import os
-from urllib.parse import urlparse
+from services._paths import resolve_upload_ref
 
-
-def _resolve_upload_ref(ref: str) -> str:
-    """Resolve frontend-provided refs (e.g. '/static/uploads/x.png' or full URLs) to local disk paths.
-
-    The AI pipeline expects filesystem paths. The upload API returns browser URLs under /static/uploads.
-    """
-    if not ref:
-        return ref
-
-    text = str(ref).strip().replace('\\', '/').replace('\\\\', '/')
-    # If it's a full URL, extract only the path portion
-    if text.startswith('http://') or text.startswith('https://'):
-        try:
-            text = urlparse(text).path or text
-        except Exception:
-            pass
-
-    # Normalize leading slash variants
-    if text.startswith('static/uploads/'):
-        filename = text.split('static/uploads/', 1)[1]
-    elif text.startswith('/static/uploads/'):
-        filename = text.split('/static/uploads/', 1)[1]
-    else:
-        # Already a filesystem path or non-static reference
-        return ref
-
-    backend_dir = os.path.dirname(__file__)
-    static_dir = os.path.abspath(os.path.join(backend_dir, '..', 'static'))
-    uploads_dir = os.path.join(static_dir, 'uploads')
-    return os.path.join(uploads_dir, filename)
+log = logging.getLogger("artha.kyc")
 
 
 # ---- CREDIT SCORE CONSTANT ----
@@ -89,23 +63,26 @@ def submit_id_documents(payload: KYCPageTwoSchema):
     - NO verification yet (verification happens in Page 3 after all data is collected)
     """
     user_id = payload.user_id
-    print(f"[KYC DEBUG] Starting Step 2 for user: {user_id}")
+    log.info("Starting Step 2 for user: %s", user_id)
 
     kyc_data = get_item("kyc", user_id)
     if not kyc_data or "basic_info" not in kyc_data:
-        print("[KYC DEBUG] Error: Basic info missing in DB")
+        log.error("Basic info missing in DB")
         raise Exception("Basic KYC info not submitted")
 
     # ---- Store ID documents without running verification ----
-    front_img = _resolve_upload_ref(payload.id_images.front_image_ref)
-    back_img = _resolve_upload_ref(payload.id_images.back_image_ref)
-    print(f"[KYC DEBUG] Image paths stored: {front_img}, {back_img}")
+    payload_dict = payload.dict()
+    id_images = payload_dict["id_images"]
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Image paths stored: %s, %s",
+                  resolve_upload_ref(id_images["front_image_ref"]),
+                  resolve_upload_ref(id_images["back_image_ref"]))
 
-    kyc_data["id_documents"] = payload.dict()
+    kyc_data["id_documents"] = payload_dict
     kyc_data["stage"] = STAGE_ID
 
     put_item("kyc", user_id, kyc_data)
-    print(f"[KYC DEBUG] Step 2 complete for {user_id} - documents stored, verification deferred to final step")
+    log.info("Step 2 complete for %s - documents stored, verification deferred to final step", user_id)
 
     return {
         "user_id": user_id,
@@ -116,6 +93,14 @@ def submit_id_documents(payload: KYCPageTwoSchema):
 from models.image_verification_model import verify_face_identity
 from models.face_pipeline import check_liveness_single_image, check_liveness_video, verify_faces_from_video
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# The KYC model inferences are independent of each other, so each
+# verification runs its own side by side (the CV/DL libs release the GIL
+# during inference). Pools are per run: a shared one would queue concurrent
+# users' verifications behind each other. Leaving the `with` block waits
+# for every submitted inference, so none is orphaned when another fails.
 
 # =========================
 # PAGE 3 — VIDEO + FINAL KYC (Actually Face Photo Match)
@@ -128,24 +113,26 @@ def submit_declaration_video(payload: KYCPageThreeSchema):
     - AI verification (OCR, face match, liveness) runs in background thread
     """
     user_id = payload.user_id
-    print(f"[KYC DEBUG] Starting Step 3 for user: {user_id}")
+    log.info("Starting Step 3 for user: %s", user_id)
 
     kyc_data = get_item("kyc", user_id)
     if not kyc_data or "id_documents" not in kyc_data:
-        print("[KYC DEBUG] Error: ID documents missing in DB")
+        log.error("ID documents missing in DB")
         raise Exception("ID documents (Page 2) not submitted")
 
     if not kyc_data.get("basic_info"):
         raise Exception("Basic info (Page 1) not submitted")
 
-    live_photo_ref = _resolve_upload_ref(payload.declaration_video.selfie_image_ref)
-    live_video_ref = _resolve_upload_ref(payload.declaration_video.video_ref)
+    payload_dict = payload.dict()
+    declaration_video = payload_dict["declaration_video"]
+    live_photo_ref = resolve_upload_ref(declaration_video["selfie_image_ref"])
+    live_video_ref = resolve_upload_ref(declaration_video["video_ref"])
 
     if not live_photo_ref and not live_video_ref:
         raise Exception("Selfie image or video not provided")
 
     # ---- SAVE DECLARATION DATA IMMEDIATELY ----
-    kyc_data["declaration"] = payload.dict()
+    kyc_data["declaration"] = payload_dict
     kyc_data["stage"] = STAGE_VIDEO
     kyc_data["status"] = "PROCESSING"
     put_item("kyc", user_id, kyc_data)
@@ -162,7 +149,7 @@ def submit_declaration_video(payload: KYCPageThreeSchema):
         daemon=True,
     )
     thread.start()
-    print(f"[KYC DEBUG] Background verification launched for {user_id}")
+    log.info("Background verification launched for %s", user_id)
 
     return {
         "user_id": user_id,
@@ -171,6 +158,52 @@ def submit_declaration_video(payload: KYCPageThreeSchema):
     }
 
 
+def _run_face_match(front_image_ref: str, live_photo_ref: str, live_video_ref: str) -> dict:
+    """STEP 2: selfie (video or photo) vs ID card face. Never raises."""
+    _t = time.time()
+    try:
+        if live_video_ref:
+            face_result = verify_faces_from_video(
+                id_image_path=front_image_ref,
+                video_path=live_video_ref,
+            )
+        else:
+            face_result = verify_face_identity(
+                image_path=live_photo_ref,
+                citizenship_image_path=front_image_ref
+            )
+        log.debug("Face result: %s", face_result)
+    except Exception as face_err:
+        log.warning("Face AI failed: %s", face_err)
+        face_result = {
+            "face_match": False,
+            "distance": 1.0,
+            "final_status": "REJECTED",
+            "reason": f"Face AI error: {str(face_err)}"
+        }
+    log.debug("STEP 2 (Face) took %.1fs", time.time() - _t)
+    return face_result
+
+
+def _run_liveness(live_photo_ref: str, live_video_ref: str) -> dict:
+    """STEP 3: liveness on the selfie video (or photo). Never raises."""
+    _t = time.time()
+    try:
+        if live_video_ref:
+            liveness_result = check_liveness_video(live_video_ref)
+        else:
+            liveness_result = check_liveness_single_image(live_photo_ref)
+        log.debug("Liveness result: %s", liveness_result)
+    except Exception as live_err:
+        log.warning("Liveness check failed: %s", live_err)
+        liveness_result = {
+            "liveness_passed": False,
+            "reason": f"Liveness error: {str(live_err)}",
+        }
+    log.debug("STEP 3 (Liveness) took %.1fs", time.time() - _t)
+    return liveness_result
+
+
 def _run_verification_background(user_id: str):
     """
     Runs ALL AI verification in a background thread so the HTTP response is instant.
@@ -178,30 +211,32 @@ def _run_verification_background(user_id: str):
     try:
         import time as _time
         _t_total = _time.time()
-        print(f"[KYC BG] Starting background verification for {user_id}")
+        log.info("Starting background verification for %s", user_id)
         kyc_data = get_item("kyc", user_id)
         if not kyc_data:
-            print(f"[KYC BG] ERROR: No KYC data found for {user_id}")
+            log.error("No KYC data found for %s", user_id)
             return
 
         basic_info = kyc_data["basic_info"]
-        front_image_ref = _resolve_upload_ref(kyc_data["id_documents"]["id_images"]["front_image_ref"])
-        back_image_ref = _resolve_upload_ref(kyc_data["id_documents"]["id_images"]["back_image_ref"])
-        live_photo_ref = _resolve_upload_ref(kyc_data["declaration"]["declaration_video"]["selfie_image_ref"])
-        live_video_ref = _resolve_upload_ref(kyc_data["declaration"]["declaration_video"].get("video_ref"))
-
-        print(f"[KYC BG] Resolved paths:")
-        print(f"[KYC BG]   front_image = {front_image_ref} (exists={os.path.isfile(front_image_ref) if front_image_ref else 'N/A'})")
-        print(f"[KYC BG]   back_image  = {back_image_ref} (exists={os.path.isfile(back_image_ref) if back_image_ref else 'N/A'})")
-        print(f"[KYC BG]   live_photo  = {live_photo_ref} (exists={os.path.isfile(live_photo_ref) if live_photo_ref else 'N/A'})")
-        if back_image_ref and os.path.isfile(back_image_ref):
-            print(f"[KYC BG]   back_image size = {os.path.getsize(back_image_ref)} bytes")
+        front_image_ref = resolve_upload_ref(kyc_data["id_documents"]["id_images"]["front_image_ref"])
+        back_image_ref = resolve_upload_ref(kyc_data["id_documents"]["id_images"]["back_image_ref"])
+        live_photo_ref = resolve_upload_ref(kyc_data["declaration"]["declaration_video"]["selfie_image_ref"])
+        live_video_ref = resolve_upload_ref(kyc_data["declaration"]["declaration_video"].get("video_ref"))
+
+        if log.isEnabledFor(logging.DEBUG):
+            # The exists/size checks are syscalls — only pay for them when logging
+            log.debug("Resolved paths:")
+            log.debug("front_image = %s (exists=%s)", front_image_ref, os.path.isfile(front_image_ref) if front_image_ref else 'N/A')
+            log.debug("back_image  = %s (exists=%s)", back_image_ref, os.path.isfile(back_image_ref) if back_image_ref else 'N/A')
+            log.debug("live_photo  = %s (exists=%s)", live_photo_ref, os.path.isfile(live_photo_ref) if live_photo_ref else 'N/A')
+            if back_image_ref and os.path.isfile(back_image_ref):
+                log.debug("back_image size = %s bytes", os.path.getsize(back_image_ref))
 
         # ============================================================
         # STEP 1: OCR VERIFICATION (citizenship card)
         # ============================================================
         _t1 = _time.time()
-        print("[KYC BG] === STEP 1: Running OCR verification ===")
+        log.debug("=== STEP 1: Running OCR verification ===")
 
         full_name = " ".join(
             filter(
@@ -227,23 +262,28 @@ def _run_verification_background(user_id: str):
         }
 
         try:
-            from models.citizenship_ocr_model import verify_citizenship_card, extract_thumbprint, detect_face_on_card
+            # OCR, thumbprint and card-face detection share no state — run them together
+            with ThreadPoolExecutor(max_workers=3, thread_name_prefix="kyc-ai") as pool:
+                f_ocr = pool.submit(
+                    verify_citizenship_card,
+                    image_path=back_image_ref,
+                    input_full_name=full_name,
+                    input_dob=dob,
+                    input_citizenship_no=citizenship_no,
+                )
+                f_thumb = pool.submit(extract_thumbprint, back_image_ref)
+                f_face = pool.submit(detect_face_on_card, front_image_ref)
 
-            ocr_result = verify_citizenship_card(
-                image_path=back_image_ref,
-                input_full_name=full_name,
-                input_dob=dob,
-                input_citizenship_no=citizenship_no,
-            )
-            print(f"[KYC BG] OCR Result: {ocr_result}")
+                ocr_result = f_ocr.result()
+                log.debug("OCR Result: %s", ocr_result)
 
-            # Store the extracted OCR data in the database
-            kyc_data["id_documents"]["ocr_extracted"] = ocr_result.get("extracted_fields", {})
-            put_item("kyc", user_id, kyc_data)  # Save immediately so OCR data is available
+                # Store the extracted OCR data in the database
+                kyc_data["id_documents"]["ocr_extracted"] = ocr_result.get("extracted_fields", {})
+                enqueue_put("kyc", user_id, kyc_data)  # Save now (off-thread) so OCR data is available
 
-            thumbprint_detected = extract_thumbprint(back_image_ref)
-            face_detected = detect_face_on_card(front_image_ref)
-            print(f"[KYC BG] Detections: Thumb:{thumbprint_detected}, Face:{face_detected}")
+                thumbprint_detected = f_thumb.result()
+                face_detected = f_face.result()
+            log.debug("Detections: Thumb:%s, Face:%s", thumbprint_detected, face_detected)
 
             ai_results.update(
                 {
@@ -256,16 +296,16 @@ def _run_verification_background(user_id: str):
                 }
             )
         except Exception as ai_err:
-            print(f"[KYC BG] OCR verification failed (non-blocking): {ai_err}")
+            log.warning("OCR verification failed (non-blocking): %s", ai_err)
             ai_results["ocr_error"] = str(ai_err)
 
-        print(f"[KYC BG] STEP 1 (OCR) took {_time.time() - _t1:.1f}s")
+        log.debug("STEP 1 (OCR) took %.1fs", _time.time() - _t1)
 
         # ============================================================
         # STEP 1.5: PEP / SANCTIONS / CFT SCREENING (OpenSanctions)
         # ============================================================
         _t15 = _time.time()
-        print("[KYC BG] === STEP 1.5: Running PEP / Sanctions / CFT screening ===")
+        log.debug("=== STEP 1.5: Running PEP / Sanctions / CFT screening ===")
 
         # Prefer the OCR-extracted name (official document name) over user-entered name
         ocr_extracted = kyc_data.get("id_documents", {}).get("ocr_extracted", {})
@@ -273,8 +313,8 @@ def _run_verification_background(user_id: str):
         screening_id = ocr_extracted.get("citizenship_certificate_number") or citizenship_no
         screening_dob = ocr_extracted.get("date_of_birth") or dob
 
-        print(f"[KYC BG] Screening with: name='{screening_name}', id='{screening_id}', dob='{screening_dob}'")
-        print(f"[KYC BG]   (source: {'OCR extracted' if ocr_extracted.get('full_name') else 'user entered'})")
+        log.debug("Screening with: name='%s', id='%s', dob='%s'", screening_name, screening_id, screening_dob)
+        log.debug("(source: %s)", 'OCR extracted' if ocr_extracted.get('full_name') else 'user entered')
 
         sanctions_result = {
             "screened": False,
@@ -287,83 +327,43 @@ def _run_verification_background(user_id: str):
         }
 
         try:
-            from services.sanctions_screening_service import screen_individual
-
             sanctions_result = screen_individual(
                 full_name=screening_name,
                 id_number=screening_id,
                 date_of_birth=screening_dob,
                 nationality="Nepal",
             )
-            print(f"[KYC BG] Sanctions screening result: PEP={sanctions_result['is_pep']}, "
-                  f"Sanctioned={sanctions_result['is_sanctioned']}, "
-                  f"Risk={sanctions_result['risk_level']}, "
-                  f"Matches={sanctions_result['total_matches']}")
+            log.debug("Sanctions screening result: PEP=%s, Sanctioned=%s, Risk=%s, Matches=%s", sanctions_result['is_pep'], sanctions_result['is_sanctioned'], sanctions_result['risk_level'], sanctions_result['total_matches'])
 
-            # Save screening result to DB immediately
+            # Save screening result to DB now (off-thread)
             kyc_data["sanctions_screening"] = sanctions_result
-            put_item("kyc", user_id, kyc_data)
+            enqueue_put("kyc", user_id, kyc_data)
 
         except Exception as sanctions_err:
-            print(f"[KYC BG] Sanctions screening failed (non-blocking): {sanctions_err}")
+            log.warning("Sanctions screening failed (non-blocking): %s", sanctions_err)
             sanctions_result["error"] = str(sanctions_err)
 
-        print(f"[KYC BG] STEP 1.5 (PEP/CFT) took {_time.time() - _t15:.1f}s")
+        log.debug("STEP 1.5 (PEP/CFT) took %.1fs", _time.time() - _t15)
 
         # ============================================================
-        # STEP 2: FACE MATCHING (selfie vs ID card)
+        # STEP 2 + 3: FACE MATCHING (selfie vs ID card) and LIVENESS CHECK
+        # Independent inferences over the same media — run side by side
         # ============================================================
         _t2 = _time.time()
-        print("[KYC BG] === STEP 2: Running face matching ===")
-
-        try:
-            if live_video_ref:
-                face_result = verify_faces_from_video(
-                    id_image_path=front_image_ref,
-                    video_path=live_video_ref,
-                )
-            else:
-                face_result = verify_face_identity(
-                    image_path=live_photo_ref,
-                    citizenship_image_path=front_image_ref
-                )
-            print(f"[KYC BG] Face result: {face_result}")
-        except Exception as face_err:
-            print(f"[KYC BG] Face AI failed: {face_err}")
-            face_result = {
-                "face_match": False,
-                "distance": 1.0,
-                "final_status": "REJECTED",
-                "reason": f"Face AI error: {str(face_err)}"
-            }
-
-        print(f"[KYC BG] STEP 2 (Face) took {_time.time() - _t2:.1f}s")
+        log.debug("=== STEP 2/3: Running face matching + liveness detection ===")
 
-        # ============================================================
-        # STEP 3: LIVENESS CHECK
-        # ============================================================
-        _t3 = _time.time()
-        print("[KYC BG] === STEP 3: Running liveness detection ===")
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="kyc-ai") as pool:
+            f_face = pool.submit(_run_face_match, front_image_ref, live_photo_ref, live_video_ref)
+            f_live = pool.submit(_run_liveness, live_photo_ref, live_video_ref)
+            face_result = f_face.result()
+            liveness_result = f_live.result()
 
-        try:
-            if live_video_ref:
-                liveness_result = check_liveness_video(live_video_ref)
-            else:
-                liveness_result = check_liveness_single_image(live_photo_ref)
-            print(f"[KYC BG] Liveness result: {liveness_result}")
-        except Exception as live_err:
-            print(f"[KYC BG] Liveness check failed: {live_err}")
-            liveness_result = {
-                "liveness_passed": False,
-                "reason": f"Liveness error: {str(live_err)}",
-            }
-
-        print(f"[KYC BG] STEP 3 (Liveness) took {_time.time() - _t3:.1f}s")
+        log.debug("STEP 2/3 (Face + Liveness) took %.1fs", _time.time() - _t2)
 
         # ============================================================
         # FINAL: MERGE ALL RESULTS
         # ============================================================
-        print("[KYC BG] === Merging all verification results ===")
+        log.debug("=== Merging all verification results ===")
         ocr_ok = ai_results.get("gov_id_verified", False)
         face_ok = bool(face_result.get("face_match"))
         live_ok = bool(liveness_result.get("liveness_passed"))
@@ -412,13 +412,13 @@ def _run_verification_background(user_id: str):
             "screening_error": sanctions_result.get("error"),
         }
 
-        print(f"[KYC BG] Final result: OCR={ocr_ok}, Face={face_ok}, Liveness={live_ok}, PEP={is_pep}, Sanctioned={is_sanctioned}")
-        print(f"[KYC BG] AML Risk Level: {aml_risk_level}")
-        print(f"[KYC BG] AI suggested status: {ai_suggested_status}")
+        log.debug("Final result: OCR=%s, Face=%s, Liveness=%s, PEP=%s, Sanctioned=%s", ocr_ok, face_ok, live_ok, is_pep, is_sanctioned)
+        log.debug("AML Risk Level: %s", aml_risk_level)
+        log.info("AI suggested status: %s", ai_suggested_status)
 
         # ---- BLOCKCHAIN WRITE ----
         try:
-            print("[KYC BG] Recording to blockchain...")
+            log.debug("Recording to blockchain...")
             record_kyc_result(final_kyc_result, user_id)
             record_identity_proof(
                 {
@@ -429,24 +429,24 @@ def _run_verification_background(user_id: str):
                 user_id,
             )
         except Exception as bc_err:
-            print(f"[KYC BG] Blockchain write failed (ignoring for dev): {bc_err}")
+            log.warning("Blockchain write failed (ignoring for dev): %s", bc_err)
 
         # ---- UPDATE DB STATE ----
+        flush_writes()  # Progress saves above must land before the re-read
         kyc_data = get_item("kyc", user_id)  # Re-read in case of concurrent changes
         kyc_data["final_result"] = final_kyc_result
         kyc_data["stage"] = STAGE_DONE
         kyc_data["status"] = "PENDING_ADMIN_REVIEW"
         put_item("kyc", user_id, kyc_data)
 
-        print(f"[KYC BG] Background verification COMPLETE for {user_id}")
-        print(f"[KYC BG] TOTAL TIME: {_time.time() - _t_total:.1f}s")
+        log.info("Background verification COMPLETE for %s", user_id)
+        log.info("TOTAL TIME: %.1fs", _time.time() - _t_total)
 
     except Exception as e:
-        print(f"[KYC BG] CRITICAL ERROR in background verification for {user_id}: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Background verification failed for %s: %s", user_id, e)
         # Mark as failed so user can retry
         try:
+            flush_writes()  # A queued progress save must not land after this
             kyc_data = get_item("kyc", user_id)
             if kyc_data:
                 kyc_data["status"] = "PENDING_ADMIN_REVIEW"
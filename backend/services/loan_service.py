@@ -12,39 +12,8 @@ from services.pdf_service import generate_loan_agreement_pdf
 from models.video_verification import verify_video_identity
 
 from db.database import get_item, put_item, get_all_items
+from utils.response_cache import invalidate as invalidate_cached
 import uuid
-from urllib.parse import urlparse
-
-
-def _resolve_upload_ref(ref: str) -> str:
-    """Resolve frontend-provided refs (e.g. '/static/uploads/x.png' or full URLs) to local disk paths.
-
-    The AI pipeline expects filesystem paths. The upload API returns browser URLs under /static/uploads.
-    """
-    if not ref:
-        return ref
-
-    text = str(ref).strip().replace('\\', '/').replace('\\\\', '/')
-    # If it's a full URL, extract only the path portion
-    if text.startswith('http://') or text.startswith('https://'):
-        try:
-            text = urlparse(text).path or text
-        except Exception:
-            pass
-
-    # Normalize leading slash variants
-    if text.startswith('static/uploads/'):
-        filename = text.split('static/uploads/', 1)[1]
-    elif text.startswith('/static/uploads/'):
-        filename = text.split('/static/uploads/', 1)[1]
-    else:
-        # Already a filesystem path or non-static reference
-        return ref
-
-    backend_dir = os.path.dirname(__file__)
-    static_dir = os.path.abspath(os.path.join(backend_dir, '..', 'static'))
-    uploads_dir = os.path.join(static_dir, 'uploads')
-    return os.path.join(uploads_dir, filename)
 
 
 # ---- CONSTANTS ----
@@ -232,6 +201,7 @@ def create_borrow_request(payload: BorrowRequestSchema):
     }
 
     put_item("loans", loan_id, loan_data)
+    invalidate_cached("stats:")
     
     # Trigger background video verification if video was uploaded
     if payload.video_verification_ref:
@@ -406,6 +376,7 @@ def accept_loan(payload: LenderAcceptanceSchema):
         print(f"Failed to store funded loan on blockchain: {bc_err}")
 
     put_item("loans", loan_id, loan)
+    invalidate_cached("stats:")
 
     # Store acceptance for audit
     put_item(
@@ -5,14 +5,23 @@ Runs video face verification asynchronously like KYC verification.
 Updates loan record with AI suggestion but leaves final decision to admin.
 """
 
+import logging
 import os
 import time as _time
-import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
-from urllib.parse import urlparse
 
 from db.database import get_item, put_item
 from models.video_verification import verify_video_identity
+from services._paths import resolve_upload_ref
+
+log = logging.getLogger("artha.loan")
+
+# Bounded worker pool for video verification: reuses threads and caps how
+# many face-model inferences run at once (CPU/VRAM), instead of one fresh
+# thread per loan. Extra loans wait in the pool's queue.
+VERIFY_WORKERS = int(os.getenv("VERIFY_WORKERS", "4"))
+_VERIFY_POOL = ThreadPoolExecutor(max_workers=VERIFY_WORKERS, thread_name_prefix="loan-verify")
 
 
 def _safe_put_loan(loan_id: str, loan: dict) -> bool:
@@ -24,93 +33,75 @@ def _safe_put_loan(loan_id: str, loan: dict) -> bool:
     """
     existing = get_item("loans", loan_id)
     if existing is None:
-        print(f"[BG VERIFICATION] Loan {loan_id} was deleted — skipping update")
+        log.warning("Loan %s was deleted — skipping update", loan_id)
         return False
     put_item("loans", loan_id, loan)
     return True
 
 
-def _resolve_upload_ref(ref: str) -> str:
-    """Resolve frontend-provided refs to local disk paths."""
-    if not ref:
-        return ref
-
-    text = str(ref).strip().replace('\\', '/').replace('\\\\', '/')
-    if text.startswith('http://') or text.startswith('https://'):
-        try:
-            text = urlparse(text).path or text
-        except Exception:
-            pass
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    """One stat() for both the existence check and the downstream cache keys."""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
 
-    if text.startswith('static/uploads/'):
-        filename = text.split('static/uploads/', 1)[1]
-    elif text.startswith('/static/uploads/'):
-        filename = text.split('/static/uploads/', 1)[1]
-    else:
-        return ref
 
-    backend_dir = os.path.dirname(__file__)
-    static_dir = os.path.abspath(os.path.join(backend_dir, '..', 'static'))
-    uploads_dir = os.path.join(static_dir, 'uploads')
-    return os.path.join(uploads_dir, filename)
+def _mark_manual_review(loan: dict, reason: str):
+    loan["ai_suggestion"] = "MANUAL_REVIEW"
+    loan["ai_suggestion_reason"] = reason
+    loan["status"] = "PENDING_ADMIN_APPROVAL"
 
 
 def verify_loan_video_background(loan_id: str):
     """
     Background task: Verify loan video against KYC selfie
-    Updates loan record with verification result and AI suggestion
+    Updates loan record with verification result and AI suggestion.
+    The loan is read once, updated in place on every path, and written
+    back exactly once at the end.
     """
-    print(f"\n[BG VERIFICATION] Starting video verification for loan {loan_id}")
+    log.info("Starting video verification for loan %s", loan_id)
     _t0 = _time.time()
+    loan = None
     
     try:
         # Get loan data
         loan = get_item("loans", loan_id)
         if not loan:
-            print(f"[BG VERIFICATION] Loan {loan_id} not found")
+            log.warning("Loan %s not found", loan_id)
             return
         
         video_ref = loan.get("video_verification_ref")
         selfie_ref = loan.get("kyc_selfie_ref")
         
         if not video_ref:
-            print(f"[BG VERIFICATION] No video reference for loan {loan_id}")
-            loan["ai_suggestion"] = "MANUAL_REVIEW"
-            loan["ai_suggestion_reason"] = "No video uploaded"
-            loan["status"] = "PENDING_ADMIN_APPROVAL"
-            _safe_put_loan(loan_id, loan)
+            log.debug("No video reference for loan %s", loan_id)
+            _mark_manual_review(loan, "No video uploaded")
             return
         
         if not selfie_ref:
-            print(f"[BG VERIFICATION] No KYC selfie reference for loan {loan_id}")
-            loan["ai_suggestion"] = "MANUAL_REVIEW"
-            loan["ai_suggestion_reason"] = "No KYC selfie found"
-            loan["status"] = "PENDING_ADMIN_APPROVAL"
-            _safe_put_loan(loan_id, loan)
+            log.debug("No KYC selfie reference for loan %s", loan_id)
+            _mark_manual_review(loan, "No KYC selfie found")
             return
         
         # Resolve file paths
-        video_path = _resolve_upload_ref(video_ref)
-        selfie_path = _resolve_upload_ref(selfie_ref)
+        video_path = resolve_upload_ref(video_ref)
+        selfie_path = resolve_upload_ref(selfie_ref)
         
-        print(f"[BG VERIFICATION] Video: {video_path}")
-        print(f"[BG VERIFICATION] Selfie: {selfie_path}")
+        log.debug("Video: %s", video_path)
+        log.debug("Selfie: %s", selfie_path)
         
         # Check files exist
-        if not os.path.exists(video_path):
-            print(f"[BG VERIFICATION] Video file not found: {video_path}")
-            loan["ai_suggestion"] = "MANUAL_REVIEW"
-            loan["ai_suggestion_reason"] = "Video file not found"
-            loan["status"] = "PENDING_ADMIN_APPROVAL"
-            _safe_put_loan(loan_id, loan)
+        video_stat = _stat_or_none(video_path)
+        if video_stat is None:
+            log.warning("Video file not found: %s", video_path)
+            _mark_manual_review(loan, "Video file not found")
             return
         
-        if not os.path.exists(selfie_path):
-            print(f"[BG VERIFICATION] Selfie file not found: {selfie_path}")
-            loan["ai_suggestion"] = "MANUAL_REVIEW"
-            loan["ai_suggestion_reason"] = "Selfie file not found"
-            loan["status"] = "PENDING_ADMIN_APPROVAL"
-            _safe_put_loan(loan_id, loan)
+        selfie_stat = _stat_or_none(selfie_path)
+        if selfie_stat is None:
+            log.warning("Selfie file not found: %s", selfie_path)
+            _mark_manual_review(loan, "Selfie file not found")
             return
         
         # Prepare path to save extracted video frame
@@ -128,16 +119,18 @@ def verify_loan_video_background(loan_id: str):
         verification_result = verify_video_identity(
             video_path=video_path,
             reference_photo_path=selfie_path,
-            save_frame_to=frame_save_path
+            save_frame_to=frame_save_path,
+            video_stat=video_stat,
+            reference_stat=selfie_stat
         )
-        print(f"[TIMING] verify_video_identity: {_time.time()-_t_verify:.2f}s")
+        log.debug("verify_video_identity: %.2fs", _time.time()-_t_verify)
         
-        print(f"[BG VERIFICATION] Result: {verification_result}")
+        log.debug("Result: %s", verification_result)
         
         # Store the extracted frame reference
         if verification_result.get("saved_frame_ref"):
             loan["video_frame_ref"] = verification_result["saved_frame_ref"]
-            print(f"[BG VERIFICATION] Saved video frame: {verification_result['saved_frame_ref']}")
+            log.debug("Saved video frame: %s", verification_result['saved_frame_ref'])
         
         # Determine AI suggestion based on face match
         if verification_result.get("face_match"):
@@ -153,42 +146,33 @@ def verify_loan_video_background(loan_id: str):
         loan["ai_suggestion_reason"] = ai_reason
         loan["status"] = "PENDING_ADMIN_APPROVAL"  # Now ready for admin review
         
-        if not _safe_put_loan(loan_id, loan):
-            return  # Loan was deleted while we were verifying
-        
-        print(f"[BG VERIFICATION] ✓ Completed for loan {loan_id}")
-        print(f"[BG VERIFICATION] AI Suggestion: {ai_suggestion} - {ai_reason}")
-        print(f"[TIMING] *** Total loan BG verification: {_time.time()-_t0:.2f}s ***")
+        log.info("✓ Completed for loan %s", loan_id)
+        log.info("AI Suggestion: %s - %s", ai_suggestion, ai_reason)
         
     except Exception as e:
-        print(f"[BG VERIFICATION] ERROR for loan {loan_id}: {e}")
-        import traceback
-        traceback.print_exc()
-        
-        # Update loan with error status
-        try:
-            loan = get_item("loans", loan_id)
-            if loan:
-                loan["video_verification_result"] = {
-                    "error": str(e),
-                    "final_status": "ERROR"
-                }
-                loan["ai_suggestion"] = "MANUAL_REVIEW"
-                loan["ai_suggestion_reason"] = f"Verification error: {str(e)}"
-                loan["status"] = "PENDING_ADMIN_APPROVAL"
+        log.exception("Video verification failed for loan %s: %s", loan_id, e)
+        
+        # Record the error on the loan (written back below)
+        if loan:
+            loan["video_verification_result"] = {
+                "error": str(e),
+                "final_status": "ERROR"
+            }
+            _mark_manual_review(loan, f"Verification error: {str(e)}")
+    
+    finally:
+        if loan:
+            try:
+                # Skips the write if the loan was deleted while we were verifying
                 _safe_put_loan(loan_id, loan)
-        except Exception as update_err:
-            print(f"[BG VERIFICATION] Failed to update error status: {update_err}")
+            except Exception as update_err:
+                log.warning("Failed to update loan %s: %s", loan_id, update_err)
+        log.info("*** Total loan BG verification: %.2fs ***", _time.time()-_t0)
 
 
 def trigger_background_verification(loan_id: str):
     """
-    Trigger background video verification in a separate thread
+    Queue background video verification on the verification worker pool
     """
-    thread = threading.Thread(
-        target=verify_loan_video_background,
-        args=(loan_id,),
-        daemon=True
-    )
-    thread.start()
-    print(f"[TRIGGER] Background verification thread started for loan {loan_id}")
+    _VERIFY_POOL.submit(verify_loan_video_background, loan_id)
+    log.info("Background verification queued for loan %s", loan_id)
@@ -1,14 +1,46 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import mm
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph, Frame
-from reportlab.lib.enums import TA_JUSTIFY
 from reportlab.lib.colors import HexColor
 from datetime import datetime
+from typing import BinaryIO, Set
 import os
+import secrets
 import textwrap
-import uuid
+import threading
+
+
+# Layout distances, scaled to points once at import
+_MM_4 = 4 * mm
+_MM_6 = 6 * mm
+_MM_8 = 8 * mm
+_MM_12 = 12 * mm
+_MM_14 = 14 * mm
+_MM_15 = 15 * mm
+_MM_20 = 20 * mm
+_MM_25 = 25 * mm
+_MM_28 = 28 * mm
+_MM_30 = 30 * mm
+_MM_35 = 35 * mm
+_MM_40 = 40 * mm
+_MM_50 = 50 * mm
+_MM_55 = 55 * mm
+_MM_60 = 60 * mm
+_MM_65 = 65 * mm
+_MM_75 = 75 * mm
+_MM_80 = 80 * mm
+_MM_90 = 90 * mm
+_MM_95 = 95 * mm
+_MM_130 = 130 * mm
+_MM_160 = 160 * mm
+_MM_165 = 165 * mm
+
+# Colours, parsed once
+_COLOR_NAVY = HexColor("#1a237e")
+_COLOR_WHITE = HexColor("#ffffff")
+_COLOR_BLACK = HexColor("#000000")
+_COLOR_SLATE = HexColor("#455a64")
+_COLOR_GREY = HexColor("#666666")
 
 
 RULES_AND_REGULATIONS = """
@@ -48,6 +80,36 @@ ARTICLE 11: GUARANTOR DEFINITION & ROLE
 Guarantor is equally and severally liable.
 """
 
+# The rules text never changes — split it and wrap it to 95 columns once
+# at import. Blank source lines stay as a single empty line.
+_RULES_LINES = tuple(RULES_AND_REGULATIONS.split("\n"))
+_RULES_WRAPPED_LINES = tuple(
+    w
+    for line in _RULES_LINES
+    for w in (textwrap.wrap(line, 95) or [""])
+)
+
+# Rules pages: 10pt Helvetica, 12pt leading, from 25 mm below the top edge
+# down to the 30 mm bottom margin — so a fixed number of lines per page
+_RULES_LEADING = 12
+_RULES_LINES_PER_PAGE = int((A4[1] - _MM_25 - _MM_30) // _RULES_LEADING) + 1
+
+# output_dirs already created by this process (skips makedirs on every PDF)
+_ENSURED_DIRS: Set[str] = set()
+_ENSURED_LOCK = threading.Lock()
+
+
+def _draw_hash_lines(c, value: str, y: float) -> float:
+    """Draw *value* in 9pt Courier, 80 chars per line, as one text object.
+    Returns the y just below the last line."""
+    chunks = [value[i:i + 80] for i in range(0, len(value), 80)]
+    t = c.beginText(_MM_25, y)
+    t.setFont("Courier", 9)
+    t.setLeading(_MM_6)
+    t.textLines("\n".join(chunks))
+    c.drawText(t)
+    return y - len(chunks) * _MM_6
+
 
 def _draw_blockchain_verification_page(c, width, height, loan_id, blockchain_tx_hash, blockchain_loan_hash, approval_date=None):
     """
@@ -55,86 +117,79 @@ def _draw_blockchain_verification_page(c, width, height, loan_id, blockchain_tx_
     This page contains the loan ID, TX hash, and data hash for admin verification.
     """
     # Background header band
-    c.setFillColor(HexColor("#1a237e"))
-    c.rect(0, height - 55 * mm, width, 55 * mm, fill=1, stroke=0)
+    c.setFillColor(_COLOR_NAVY)
+    c.rect(0, height - _MM_55, width, _MM_55, fill=1, stroke=0)
 
     # Title
-    c.setFillColor(HexColor("#ffffff"))
+    c.setFillColor(_COLOR_WHITE)
     c.setFont("Helvetica-Bold", 18)
-    c.drawCentredString(width / 2, height - 20 * mm, "BLOCKCHAIN VERIFICATION CERTIFICATE")
+    c.drawCentredString(width / 2, height - _MM_20, "BLOCKCHAIN VERIFICATION CERTIFICATE")
     c.setFont("Helvetica", 11)
-    c.drawCentredString(width / 2, height - 30 * mm, "ARTHA P2P PLATFORM - Immutable Loan Record")
+    c.drawCentredString(width / 2, height - _MM_30, "ARTHA P2P PLATFORM - Immutable Loan Record")
     c.setFont("Helvetica", 9)
-    c.drawCentredString(width / 2, height - 40 * mm, "This page certifies that the loan agreement has been recorded on the blockchain")
+    c.drawCentredString(width / 2, height - _MM_40, "This page certifies that the loan agreement has been recorded on the blockchain")
 
     # Reset fill color
-    c.setFillColor(HexColor("#000000"))
+    c.setFillColor(_COLOR_BLACK)
 
-    y = height - 75 * mm
+    y = height - _MM_75
 
     # Loan ID (large, prominent)
     c.setFont("Helvetica-Bold", 13)
-    c.drawString(25 * mm, y, "LOAN ID:")
+    c.drawString(_MM_25, y, "LOAN ID:")
     c.setFont("Courier-Bold", 14)
-    c.setFillColor(HexColor("#1a237e"))
-    c.drawString(55 * mm, y, str(loan_id))
-    c.setFillColor(HexColor("#000000"))
-    y -= 15 * mm
+    c.setFillColor(_COLOR_NAVY)
+    c.drawString(_MM_55, y, str(loan_id))
+    c.setFillColor(_COLOR_BLACK)
+    y -= _MM_15
 
     # Approval date
     if approval_date:
         c.setFont("Helvetica-Bold", 11)
-        c.drawString(25 * mm, y, "Approval Date:")
+        c.drawString(_MM_25, y, "Approval Date:")
         c.setFont("Helvetica", 11)
-        c.drawString(65 * mm, y, str(approval_date))
-        y -= 12 * mm
+        c.drawString(_MM_65, y, str(approval_date))
+        y -= _MM_12
 
     # Divider
-    c.setStrokeColor(HexColor("#1a237e"))
+    c.setStrokeColor(_COLOR_NAVY)
     c.setLineWidth(1.5)
-    c.line(25 * mm, y, width - 25 * mm, y)
-    y -= 12 * mm
+    c.line(_MM_25, y, width - _MM_25, y)
+    y -= _MM_12
 
     # Blockchain Transaction Hash
     c.setFont("Helvetica-Bold", 11)
-    c.drawString(25 * mm, y, "Blockchain Transaction Hash (TX Hash):")
-    y -= 8 * mm
-    c.setFont("Courier", 9)
+    c.drawString(_MM_25, y, "Blockchain Transaction Hash (TX Hash):")
+    y -= _MM_8
     tx_display = str(blockchain_tx_hash) if blockchain_tx_hash else "Pending..."
     # Wrap long hash across lines
-    for i in range(0, len(tx_display), 80):
-        c.drawString(25 * mm, y, tx_display[i:i+80])
-        y -= 6 * mm
-    y -= 4 * mm
+    y = _draw_hash_lines(c, tx_display, y)
+    y -= _MM_4
 
     # Blockchain Data Hash
     c.setFont("Helvetica-Bold", 11)
-    c.drawString(25 * mm, y, "Loan Data Hash (SHA-256):")
-    y -= 8 * mm
-    c.setFont("Courier", 9)
+    c.drawString(_MM_25, y, "Loan Data Hash (SHA-256):")
+    y -= _MM_8
     hash_display = str(blockchain_loan_hash) if blockchain_loan_hash else "Pending..."
-    for i in range(0, len(hash_display), 80):
-        c.drawString(25 * mm, y, hash_display[i:i+80])
-        y -= 6 * mm
-    y -= 8 * mm
+    y = _draw_hash_lines(c, hash_display, y)
+    y -= _MM_8
 
     # Divider
-    c.setStrokeColor(HexColor("#1a237e"))
-    c.line(25 * mm, y, width - 25 * mm, y)
-    y -= 12 * mm
+    c.setStrokeColor(_COLOR_NAVY)
+    c.line(_MM_25, y, width - _MM_25, y)
+    y -= _MM_12
 
     # Verification instructions box
-    c.setStrokeColor(HexColor("#455a64"))
+    c.setStrokeColor(_COLOR_SLATE)
     c.setLineWidth(0.5)
     box_top = y
-    box_height = 50 * mm
-    c.rect(25 * mm, y - box_height, width - 50 * mm, box_height, fill=0, stroke=1)
+    box_height = _MM_50
+    c.rect(_MM_25, y - box_height, width - _MM_50, box_height, fill=0, stroke=1)
 
     c.setFont("Helvetica-Bold", 10)
-    c.setFillColor(HexColor("#1a237e"))
-    c.drawString(28 * mm, y - 6 * mm, "HOW TO VERIFY THIS LOAN:")
-    c.setFillColor(HexColor("#000000"))
-    c.setFont("Helvetica", 9)
+    c.setFillColor(_COLOR_NAVY)
+    c.drawString(_MM_28, y - _MM_6, "HOW TO VERIFY THIS LOAN:")
+    c.setFillColor(_COLOR_BLACK)
 
     instructions = [
         "1. Go to the Artha P2P Blockchain Explorer",
@@ -144,20 +199,22 @@ def _draw_blockchain_verification_page(c, width, height, loan_id, blockchain_tx_
         "5. Compare the Data Hash above with the hash shown in the explorer",
         "6. If both hashes match, the loan data has NOT been tampered with",
     ]
-    iy = y - 14 * mm
-    for inst in instructions:
-        c.drawString(28 * mm, iy, inst)
-        iy -= 6 * mm
+    t = c.beginText(_MM_28, y - _MM_14)
+    t.setFont("Helvetica", 9)
+    t.setLeading(_MM_6)
+    t.textLines("\n".join(instructions))
+    c.drawText(t)
 
     # Footer
     c.setFont("Helvetica-Oblique", 8)
-    c.setFillColor(HexColor("#666666"))
-    c.drawCentredString(width / 2, 20 * mm, "This blockchain record is immutable and cannot be altered after creation.")
-    c.drawCentredString(width / 2, 15 * mm, f"Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-    c.setFillColor(HexColor("#000000"))
+    c.setFillColor(_COLOR_GREY)
+    c.drawCentredString(width / 2, _MM_20, "This blockchain record is immutable and cannot be altered after creation.")
+    c.drawCentredString(width / 2, _MM_15, f"Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}")
+    # No colour reset: the caller ends the page, and showPage() resets it
 
 
-def generate_loan_agreement_pdf(
+def generate_loan_agreement_pdf_to_stream(
+    out: BinaryIO,
     borrower_full_name: str,
     borrower_citizenship_no: str,
     guarantor_full_name: str,
@@ -171,40 +228,30 @@ def generate_loan_agreement_pdf(
     blockchain_tx_hash: str = None,
     blockchain_loan_hash: str = None,
     approval_date: str = None,
-    output_dir: str = "generated_pdfs",
 ):
     """
-    Generates loan agreement PDF (A4, multi-page).
+    Writes the loan agreement PDF (A4, multi-page) to the binary stream *out*
+    (an open file, BytesIO, response body, ...).
     Includes Loan ID on the first page.
     If blockchain hashes are provided, appends a Blockchain Verification page.
-    Returns file path.
     """
-
-    os.makedirs(output_dir, exist_ok=True)
-    file_name = f"loan_agreement_{uuid.uuid4().hex}.pdf"
-    file_path = os.path.join(output_dir, file_name)
-
-    c = canvas.Canvas(file_path, pagesize=A4)
+    c = canvas.Canvas(out, pagesize=A4)
     width, height = A4
 
-    styles = getSampleStyleSheet()
-    normal_style = styles["Normal"]
-    normal_style.alignment = TA_JUSTIFY
-
     # -------- PAGE 1 : TITLE & LOAN DETAILS --------
     c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(width / 2, height - 30 * mm, "ARTHA P2P PLATFORM")
-    c.drawCentredString(width / 2, height - 40 * mm, "RULES AND REGULATIONS")
+    c.drawCentredString(width / 2, height - _MM_30, "ARTHA P2P PLATFORM")
+    c.drawCentredString(width / 2, height - _MM_40, "RULES AND REGULATIONS")
 
     # Loan ID prominently displayed
     if loan_id:
         c.setFont("Helvetica-Bold", 12)
-        c.setFillColor(HexColor("#1a237e"))
-        c.drawCentredString(width / 2, height - 50 * mm, f"LOAN ID: {loan_id}")
-        c.setFillColor(HexColor("#000000"))
+        c.setFillColor(_COLOR_NAVY)
+        c.drawCentredString(width / 2, height - _MM_50, f"LOAN ID: {loan_id}")
+        c.setFillColor(_COLOR_BLACK)
 
     c.setFont("Helvetica", 11)
-    y = height - 65 * mm
+    y = height - _MM_65
 
     details = [
         f"Borrower Full Name: {borrower_full_name}",
@@ -218,56 +265,61 @@ def generate_loan_agreement_pdf(
         f"Net Amount Returned (if paid fully): Rs. {net_amount_returned}",
     ]
 
-    for line in details:
-        c.drawString(30 * mm, y, line)
-        y -= 8 * mm
+    t = c.beginText(_MM_30, y)
+    t.setFont("Helvetica", 11)
+    t.setLeading(_MM_8)
+    t.textLines("\n".join(details))
+    c.drawText(t)
+    y -= _MM_8 * len(details)
 
     # Borrower signature (first page)
-    c.line(30 * mm, 40 * mm, 90 * mm, 40 * mm)
-    c.drawString(30 * mm, 35 * mm, "Borrower Signature")
+    c.line(_MM_30, _MM_40, _MM_90, _MM_40)
+    c.drawString(_MM_30, _MM_35, "Borrower Signature")
 
     c.showPage()
 
     # -------- RULES & REGULATIONS (MULTI-PAGE) --------
-    text = c.beginText(25 * mm, height - 25 * mm)
-    c.setFont("Helvetica", 10)
-
-    for line in RULES_AND_REGULATIONS.split("\n"):
-        wrapped = textwrap.wrap(line, 95)
-        if not wrapped:
-            text.textLine("")
-        for w in wrapped:
-            if text.getY() < 30 * mm:
-                c.drawText(text)
-                c.showPage()
-                text = c.beginText(25 * mm, height - 25 * mm)
-                c.setFont("Helvetica", 10)
-            text.textLine(w)
+    # The text object carries its own font; the canvas font is only needed
+    # for the signature label after the last rules page
+    text = c.beginText(_MM_25, height - _MM_25)
+    text.setFont("Helvetica", 10, _RULES_LEADING)
+
+    n = 0
+    for w in _RULES_WRAPPED_LINES:
+        if n == _RULES_LINES_PER_PAGE:
+            c.drawText(text)
+            c.showPage()
+            text = c.beginText(_MM_25, height - _MM_25)
+            text.setFont("Helvetica", 10, _RULES_LEADING)
+            n = 0
+        text.textLine(w)
+        n += 1
 
     c.drawText(text)
 
     # Borrower signature on rules pages
-    c.line(30 * mm, 30 * mm, 90 * mm, 30 * mm)
-    c.drawString(30 * mm, 25 * mm, "Borrower Signature")
+    c.setFont("Helvetica", 10)
+    c.line(_MM_30, _MM_30, _MM_90, _MM_30)
+    c.drawString(_MM_30, _MM_25, "Borrower Signature")
 
     c.showPage()
 
     # -------- THUMBPRINTS PAGE --------
     c.setFont("Helvetica-Bold", 12)
-    c.drawCentredString(width / 2, height - 30 * mm, "THUMBPRINT CONFIRMATION")
+    c.drawCentredString(width / 2, height - _MM_30, "THUMBPRINT CONFIRMATION")
 
     c.setFont("Helvetica", 11)
-    c.drawString(30 * mm, height - 60 * mm, "Borrower Thumbprints:")
-    c.rect(30 * mm, height - 90 * mm, 40 * mm, 30 * mm)
-    c.rect(80 * mm, height - 90 * mm, 40 * mm, 30 * mm)
-    c.drawString(30 * mm, height - 95 * mm, "Left Thumb")
-    c.drawString(80 * mm, height - 95 * mm, "Right Thumb")
-
-    c.drawString(30 * mm, height - 130 * mm, "Guarantor Thumbprints:")
-    c.rect(30 * mm, height - 160 * mm, 40 * mm, 30 * mm)
-    c.rect(80 * mm, height - 160 * mm, 40 * mm, 30 * mm)
-    c.drawString(30 * mm, height - 165 * mm, "Left Thumb")
-    c.drawString(80 * mm, height - 165 * mm, "Right Thumb")
+    c.drawString(_MM_30, height - _MM_60, "Borrower Thumbprints:")
+    c.rect(_MM_30, height - _MM_90, _MM_40, _MM_30)
+    c.rect(_MM_80, height - _MM_90, _MM_40, _MM_30)
+    c.drawString(_MM_30, height - _MM_95, "Left Thumb")
+    c.drawString(_MM_80, height - _MM_95, "Right Thumb")
+
+    c.drawString(_MM_30, height - _MM_130, "Guarantor Thumbprints:")
+    c.rect(_MM_30, height - _MM_160, _MM_40, _MM_30)
+    c.rect(_MM_80, height - _MM_160, _MM_40, _MM_30)
+    c.drawString(_MM_30, height - _MM_165, "Left Thumb")
+    c.drawString(_MM_80, height - _MM_165, "Right Thumb")
 
     c.showPage()
 
@@ -284,6 +336,66 @@ def generate_loan_agreement_pdf(
 
     c.save()
 
+
+def generate_loan_agreement_pdf(
+    borrower_full_name: str,
+    borrower_citizenship_no: str,
+    guarantor_full_name: str,
+    guarantor_citizenship_no: str,
+    amount: int,
+    interest_rate: float,
+    tenure_months: int,
+    net_amount_received: float,
+    net_amount_returned: float,
+    loan_id: str = None,
+    blockchain_tx_hash: str = None,
+    blockchain_loan_hash: str = None,
+    approval_date: str = None,
+    output_dir: str = "generated_pdfs",
+):
+    """
+    Generates loan agreement PDF under *output_dir*
+    (see generate_loan_agreement_pdf_to_stream).
+    Returns file path.
+    """
+
+    if output_dir not in _ENSURED_DIRS:
+        with _ENSURED_LOCK:
+            os.makedirs(output_dir, exist_ok=True)
+            _ENSURED_DIRS.add(output_dir)
+    file_name = f"loan_agreement_{secrets.token_hex(16)}.pdf"
+    file_path = os.path.join(output_dir, file_name)
+
+    # Render into a temp file next to the target (1 MiB buffer: one write for
+    # typical agreements) and rename it into place, so a render that fails
+    # partway never leaves a truncated PDF at file_path to be served/hashed
+    tmp_path = f"{file_path}.part"
+    try:
+        with open(tmp_path, "wb", buffering=1 << 20) as f:
+            generate_loan_agreement_pdf_to_stream(
+                f,
+                borrower_full_name=borrower_full_name,
+                borrower_citizenship_no=borrower_citizenship_no,
+                guarantor_full_name=guarantor_full_name,
+                guarantor_citizenship_no=guarantor_citizenship_no,
+                amount=amount,
+                interest_rate=interest_rate,
+                tenure_months=tenure_months,
+                net_amount_received=net_amount_received,
+                net_amount_returned=net_amount_returned,
+                loan_id=loan_id,
+                blockchain_tx_hash=blockchain_tx_hash,
+                blockchain_loan_hash=blockchain_loan_hash,
+                approval_date=approval_date,
+            )
+        os.replace(tmp_path, file_path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
     return file_path
 
 
@@ -9,9 +9,25 @@ Uses the OpenSanctions Match API to check individuals against:
 API Docs: https://www.opensanctions.org/docs/api/matching/
 """
 
+import copy
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import logging
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
@@ -30,40 +46,56 @@ PEP_SCORE_THRESHOLD = float(os.getenv("PEP_SCORE_THRESHOLD", "0.50"))
 SANCTIONS_SCORE_THRESHOLD = float(os.getenv("SANCTIONS_SCORE_THRESHOLD", "0.50"))
 
 # Topics that indicate PEP
-PEP_TOPICS = {"role.pep", "role.rca", "poi"}
+PEP_TOPICS = frozenset({"role.pep", "role.rca", "poi"})
 # Topics that indicate sanctions / CFT
-SANCTIONS_TOPICS = {"sanction", "debarment", "crime", "crime.fin", "crime.terror"}
+SANCTIONS_TOPICS = frozenset({"sanction", "debarment", "crime", "crime.fin", "crime.terror"})
 
+# One keep-alive session for every screening, so calls skip the TCP + TLS
+# handshake to the API. Match queries are read-only, so POST is retried on
+# transient errors; raise_on_status=False hands the last response back to
+# the status check in _screen_batch().
+_SESSION = requests.Session()
+_SESSION.headers["Authorization"] = f"ApiKey {OPENSANCTIONS_API_KEY}"
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    ),
+))
 
-def screen_individual(
-    full_name: str,
-    id_number: str = None,
-    date_of_birth: str = None,
-    nationality: str = "Nepal",
-) -> dict:
-    """
-    Screen an individual against OpenSanctions for PEP, sanctions, and CFT.
 
-    Args:
-        full_name:      Full name of the person (e.g. "Ram Bahadur Thapa")
-        id_number:       National ID / citizenship number (optional)
-        date_of_birth:  Date of birth in any format (optional, e.g. "1990-01-15")
-        nationality:    Country (default "Nepal")
+# The Match API takes many query entities per request; bigger batches are split
+MATCH_BATCH_SIZE = 100
 
-    Returns:
-        {
-            "screened": True/False,          # whether screening was performed
-            "is_pep": True/False,            # Politically Exposed Person
-            "is_sanctioned": True/False,     # On sanctions / CFT list
-            "risk_level": "LOW" | "MEDIUM" | "HIGH" | "CRITICAL",
-            "total_matches": int,
-            "pep_matches": [...],            # list of PEP match details
-            "sanctions_matches": [...],      # list of sanctions match details
-            "all_matches": [...],            # all raw matches
-            "error": None or str
-        }
-    """
-    result = {
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# screen_many() runs separate screenings side by side on this pool (pure
+# network I/O); sized below the session's 20-connection pool
+_SCREEN_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="sanctions")
+
+# Successful screenings are reused for an hour: the same borrower/guarantor is
+# often screened again (retries, re-submits), and each call costs API quota.
+# Errors are never cached. Keys hold personal data, so the results live in
+# their own bounded store rather than the shared response cache.
+SANCTIONS_CACHE_MAX = 4096
+SANCTIONS_CACHE_TTL = 3600
+_SANCTIONS_CACHE = TTLCache(maxsize=SANCTIONS_CACHE_MAX, ttl=SANCTIONS_CACHE_TTL)
+_SANCTIONS_CACHE_LOCK = threading.RLock()
+
+# Responses declared (Content-Length) at least this big are parsed
+# incrementally with ijson, one query's results at a time, instead of loaded
+# whole. Chunked replies of unknown size are usually a handful of queries,
+# where ijson only adds overhead, so they are loaded whole.
+STREAM_DECODE_MIN_BYTES = 1 << 20
+
+
+def _empty_result() -> dict:
+    return {
         "screened": False,
         "is_pep": False,
         "is_sanctioned": False,
@@ -75,133 +107,269 @@ def screen_individual(
         "error": None,
     }
 
-    if not full_name or not full_name.strip():
-        result["error"] = "No name provided for screening"
-        return result
 
-    # ── Build the FtM entity ─────────────────────────────────────────────
-    name_parts = full_name.strip().split()
-    properties = {}
-
-    if len(name_parts) == 1:
-        properties["name"] = [full_name.strip()]
+def _build_person_entity(
+    full_name: str,
+    id_number: str = None,
+    date_of_birth: str = None,
+    nationality: str = "Nepal",
+) -> dict:
+    """Build the FtM Person entity the Match API expects."""
+    name = full_name.strip()
+    parts = name.split()
+    if len(parts) == 1:
+        properties = {"name": [name]}
+    elif len(parts) == 2:
+        properties = {"firstName": [parts[0]], "lastName": [parts[1]]}
     else:
-        properties["firstName"] = [name_parts[0]]
-        properties["lastName"] = [name_parts[-1]]
-        if len(name_parts) > 2:
-            properties["fatherName"] = [" ".join(name_parts[1:-1])]
+        properties = {
+            "firstName": [parts[0]],
+            "lastName": [parts[-1]],
+            "fatherName": [" ".join(parts[1:-1])],
+        }
 
     if date_of_birth:
         properties["birthDate"] = [date_of_birth]
-
     if nationality:
         properties["nationality"] = [nationality]
-
     if id_number:
         properties["idNumber"] = [str(id_number)]
 
-    query_entity = {
-        "schema": "Person",
-        "properties": properties,
-    }
+    return {"schema": "Person", "properties": properties}
 
-    batch_payload = {
-        "queries": {
-            "kyc_check": query_entity,
+
+def _classify_matches(result: dict, matches: list):
+    """Fill *result* (see screen_individual) from one query's API matches."""
+    result["screened"] = True
+    result["total_matches"] = len(matches)
+
+    # ── Classify each match ──────────────────────────────────────────
+    for match in matches:
+        score = match.get("score", 0)
+        topics = match.get("properties", {}).get("topics", [])
+        entity_id = match.get("id", "")
+        caption = match.get("caption", "")
+        datasets = match.get("datasets", [])
+        match_schema = match.get("schema", "")
+        props = match.get("properties", {})
+
+        match_info = {
+            "entity_id": entity_id,
+            "name": caption,
+            "score": round(score, 3),
+            "topics": list(topics),
+            "datasets": datasets,
+            "schema": match_schema,
+            "country": props.get("country", []),
+            "birth_date": props.get("birthDate", []),
+            "position": props.get("position", []),
+            "notes": props.get("notes", []),
         }
-    }
 
-    # ── Call API ─────────────────────────────────────────────────────────
-    try:
-        logger.info(f"[SANCTIONS] Screening: {full_name} (ID: {id_number})")
-        session = requests.Session()
-        session.headers["Authorization"] = f"ApiKey {OPENSANCTIONS_API_KEY}"
+        result["all_matches"].append(match_info)
+
+        # Check PEP
+        if score >= PEP_SCORE_THRESHOLD and not PEP_TOPICS.isdisjoint(topics):
+            match_info["match_type"] = "PEP"
+            result["pep_matches"].append(match_info)
+            result["is_pep"] = True
+
+        # Check Sanctions / CFT
+        if score >= SANCTIONS_SCORE_THRESHOLD and not SANCTIONS_TOPICS.isdisjoint(topics):
+            match_info["match_type"] = "SANCTIONS/CFT"
+            result["sanctions_matches"].append(match_info)
+            result["is_sanctioned"] = True
 
-        response = session.post(
+    # ── Determine risk level ─────────────────────────────────────────
+    if result["is_sanctioned"]:
+        result["risk_level"] = "CRITICAL"
+    elif result["is_pep"]:
+        # PEP with high score
+        max_pep_score = max(
+            (m["score"] for m in result["pep_matches"]), default=0
+        )
+        result["risk_level"] = "HIGH" if max_pep_score >= 0.7 else "MEDIUM"
+    elif result["total_matches"] > 0:
+        max_score = max(
+            (m.get("score", 0) for m in result["all_matches"]), default=0
+        )
+        if max_score >= 0.5:
+            result["risk_level"] = "MEDIUM"
+        else:
+            result["risk_level"] = "LOW"
+
+
+def _screen_batch(queries: dict, results: dict):
+    """POST one batch of *queries* and fill the matching entries of *results*."""
+    try:
+        if orjson is not None:
+            body = {"data": orjson.dumps({"queries": queries}), "headers": _JSON_HEADERS}
+        else:
+            body = {"json": {"queries": queries}}
+        with _SESSION.post(
             OPENSANCTIONS_URL,
-            json=batch_payload,
             params={"algorithm": "best"},
             timeout=15,
-        )
-        response.raise_for_status()
+            stream=True,
+            **body,
+        ) as response:
+            status = response.status_code
+            if not 200 <= status < 300:
+                # Retries already happened in the adapter; the error body
+                # (often an HTML page) is never read or parsed
+                logger.warning(f"[SANCTIONS] API HTTP error: {status}")
+                error = f"Screening API error: {status}"
+                for query_id in queries:
+                    results[query_id]["error"] = error
+                return
+
+            length = int(response.headers.get("Content-Length") or 0)
+            if ijson is not None and length >= STREAM_DECODE_MIN_BYTES:
+                response.raw.decode_content = True
+                pending = set(queries)
+                for query_id, query_response in ijson.kvitems(response.raw, "responses", use_float=True):
+                    if query_id in pending:
+                        pending.discard(query_id)
+                        _classify_matches(results[query_id], query_response.get("results", []))
+                for query_id in pending:
+                    _classify_matches(results[query_id], [])
+                return
+
+            data = orjson.loads(response.content) if orjson is not None else response.json()
 
-        data = response.json()
         responses = data.get("responses", {})
-        check_result = responses.get("kyc_check", {})
-        matches = check_result.get("results", [])
-
-        result["screened"] = True
-        result["total_matches"] = len(matches)
-
-        # ── Classify each match ──────────────────────────────────────────
-        for match in matches:
-            score = match.get("score", 0)
-            topics = set(match.get("properties", {}).get("topics", []))
-            entity_id = match.get("id", "")
-            caption = match.get("caption", "")
-            datasets = match.get("datasets", [])
-            match_schema = match.get("schema", "")
-            props = match.get("properties", {})
-
-            match_info = {
-                "entity_id": entity_id,
-                "name": caption,
-                "score": round(score, 3),
-                "topics": list(topics),
-                "datasets": datasets,
-                "schema": match_schema,
-                "country": props.get("country", []),
-                "birth_date": props.get("birthDate", []),
-                "position": props.get("position", []),
-                "notes": props.get("notes", []),
-            }
-
-            result["all_matches"].append(match_info)
-
-            # Check PEP
-            if topics & PEP_TOPICS and score >= PEP_SCORE_THRESHOLD:
-                match_info["match_type"] = "PEP"
-                result["pep_matches"].append(match_info)
-                result["is_pep"] = True
-
-            # Check Sanctions / CFT
-            if topics & SANCTIONS_TOPICS and score >= SANCTIONS_SCORE_THRESHOLD:
-                match_info["match_type"] = "SANCTIONS/CFT"
-                result["sanctions_matches"].append(match_info)
-                result["is_sanctioned"] = True
-
-        # ── Determine risk level ─────────────────────────────────────────
-        if result["is_sanctioned"]:
-            result["risk_level"] = "CRITICAL"
-        elif result["is_pep"]:
-            # PEP with high score
-            max_pep_score = max(
-                (m["score"] for m in result["pep_matches"]), default=0
-            )
-            result["risk_level"] = "HIGH" if max_pep_score >= 0.7 else "MEDIUM"
-        elif result["total_matches"] > 0:
-            max_score = max(
-                (m.get("score", 0) for m in result["all_matches"]), default=0
-            )
-            if max_score >= 0.5:
-                result["risk_level"] = "MEDIUM"
-            else:
-                result["risk_level"] = "LOW"
-
-        logger.info(
-            f"[SANCTIONS] Result for {full_name}: "
-            f"PEP={result['is_pep']}, Sanctioned={result['is_sanctioned']}, "
-            f"Risk={result['risk_level']}, Matches={result['total_matches']}"
-        )
+        for query_id in queries:
+            _classify_matches(results[query_id], responses.get(query_id, {}).get("results", []))
+        return
 
     except requests.exceptions.Timeout:
         logger.warning("[SANCTIONS] OpenSanctions API timed out")
-        result["error"] = "Screening service timed out"
-    except requests.exceptions.HTTPError as e:
-        logger.error(f"[SANCTIONS] API HTTP error: {e}")
-        result["error"] = f"Screening API error: {e.response.status_code}"
+        error = "Screening service timed out"
     except Exception as e:
         logger.error(f"[SANCTIONS] Screening failed: {e}")
-        result["error"] = f"Screening failed: {str(e)}"
+        error = f"Screening failed: {str(e)}"
+
+    for query_id in queries:
+        results[query_id]["error"] = error
+
+
+def _cache_key(person: dict) -> tuple:
+    return (
+        person["full_name"].strip().lower(),
+        str(person.get("id_number") or ""),
+        person.get("date_of_birth") or "",
+        person.get("nationality", "Nepal") or "",
+    )
+
+
+def screen_individuals_batch(people: list) -> list:
+    """
+    Screen several individuals with one Match API request per
+    MATCH_BATCH_SIZE people (e.g. borrower + guarantor together).
+
+    Args:
+        people: list of dicts with screen_individual's keyword arguments
+                (full_name, and optionally id_number, date_of_birth, nationality)
+
+    Returns:
+        list of screen_individual-style result dicts, in the order of *people*
+    """
+    results = {}
+    queries = {}
+    cache_keys = {}
+    for i, person in enumerate(people):
+        query_id = f"q_{i}"
+        full_name = person.get("full_name")
+        if not full_name or not full_name.strip():
+            results[query_id] = _empty_result()
+            results[query_id]["error"] = "No name provided for screening"
+            continue
+        cache_key = _cache_key(person)
+        with _SANCTIONS_CACHE_LOCK:
+            cached = _SANCTIONS_CACHE.get(cache_key)
+        if cached is not None:
+            # Callers add to / store the result, so never hand out the cached dict
+            results[query_id] = copy.deepcopy(cached)
+            continue
+        results[query_id] = _empty_result()
+        cache_keys[query_id] = cache_key
+        logger.info(f"[SANCTIONS] Screening: {full_name} (ID: {person.get('id_number')})")
+        queries[query_id] = _build_person_entity(**person)
+
+    query_items = list(queries.items())
+    for start in range(0, len(query_items), MATCH_BATCH_SIZE):
+        _screen_batch(dict(query_items[start:start + MATCH_BATCH_SIZE]), results)
+
+    for query_id, cache_key in cache_keys.items():
+        result = results[query_id]
+        if result["screened"] and result["error"] is None:
+            cached = copy.deepcopy(result)
+            with _SANCTIONS_CACHE_LOCK:
+                _SANCTIONS_CACHE[cache_key] = cached
+
+    ordered = []
+    for i, person in enumerate(people):
+        result = results[f"q_{i}"]
+        if result["screened"]:
+            logger.info(
+                f"[SANCTIONS] Result for {person.get('full_name')}: "
+                f"PEP={result['is_pep']}, Sanctioned={result['is_sanctioned']}, "
+                f"Risk={result['risk_level']}, Matches={result['total_matches']}"
+            )
+        ordered.append(result)
+    return ordered
+
+
+def screen_individual(
+    full_name: str,
+    id_number: str = None,
+    date_of_birth: str = None,
+    nationality: str = "Nepal",
+) -> dict:
+    """
+    Screen an individual against OpenSanctions for PEP, sanctions, and CFT.
+
+    Args:
+        full_name:      Full name of the person (e.g. "Ram Bahadur Thapa")
+        id_number:       National ID / citizenship number (optional)
+        date_of_birth:  Date of birth in any format (optional, e.g. "1990-01-15")
+        nationality:    Country (default "Nepal")
+
+    Returns:
+        {
+            "screened": True/False,          # whether screening was performed
+            "is_pep": True/False,            # Politically Exposed Person
+            "is_sanctioned": True/False,     # On sanctions / CFT list
+            "risk_level": "LOW" | "MEDIUM" | "HIGH" | "CRITICAL",
+            "total_matches": int,
+            "pep_matches": [...],            # list of PEP match details
+            "sanctions_matches": [...],      # list of sanctions match details
+            "all_matches": [...],            # all raw matches
+            "error": None or str
+        }
+    """
+    return screen_individuals_batch([{
+        "full_name": full_name,
+        "id_number": id_number,
+        "date_of_birth": date_of_birth,
+        "nationality": nationality,
+    }])[0]
 
-    return result
+
+def screen_many(people: list) -> dict:
+    """
+    Screen several individuals with one concurrent screen_individual call
+    each, e.g. borrower, guarantor and nominees in an approval flow.
+    screen_individuals_batch() sends them in one request instead.
+
+    Args:
+        people: list of {"key": <caller's label>, "args": {screen_individual kwargs}}
+
+    Returns:
+        {key: screen_individual result}
+    """
+    futures = [
+        (person["key"], _SCREEN_POOL.submit(screen_individual, **person["args"]))
+        for person in people
+    ]
+    return {key: future.result() for key, future in futures}
@@ -0,0 +1,62 @@
+"""
+Model warm-up.
+
+The first KYC / loan verification after a restart used to pay for loading
+the face detectors and the OCR pipeline (seconds each). warmup_models()
+runs every model once on a blank image at startup instead, so that cost
+lands on boot rather than on a user's submission.
+"""
+
+import logging
+import threading
+import time
+
+import numpy as np
+
+log = logging.getLogger("artha.warmup")
+
+# Blank input: large enough for the detectors' input resize, no face in it
+_BLANK = np.zeros((64, 64, 3), dtype=np.uint8)
+
+# Detector backends used by image_verification_model (retinaface) and
+# video_verification (ssd); both share the ArcFace recogniser.
+_FACE_DETECTORS = ("ssd", "retinaface")
+
+
+def _warm_face_models():
+    from deepface import DeepFace
+
+    for backend in _FACE_DETECTORS:
+        # enforce_detection=False: no face in the blank image, but the
+        # detector + ArcFace graphs are still built and run once
+        DeepFace.represent(
+            img_path=_BLANK,
+            model_name="ArcFace",
+            detector_backend=backend,
+            enforce_detection=False,
+        )
+
+
+def _warm_ocr_pipeline():
+    from models.citizenship_ocr_model import _get_pipeline
+
+    # Background verifications build their own pipeline per thread, but this
+    # pulls the Paddle weights into the page cache and does the one-off
+    # framework init.
+    _get_pipeline()
+
+
+def warmup_models():
+    """Run each verification model once. Failures are logged, never raised."""
+    for name, warm in (("face", _warm_face_models), ("ocr", _warm_ocr_pipeline)):
+        t0 = time.time()
+        try:
+            warm()
+            log.info("Warmed %s models in %.1fs", name, time.time() - t0)
+        except Exception as e:
+            log.warning("Warm-up of %s models failed: %s", name, e)
+
+
+def start_warmup():
+    """Warm the models on a daemon thread so startup isn't blocked."""
+    threading.Thread(target=warmup_models, name="model-warmup", daemon=True).start()
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+# In-process TTL cache for public explorer responses.
+# Keys are versioned strings like "stats:platform:v1" so a shape change
+# just bumps the suffix instead of serving stale payloads.
+# Some keys come from public queries, so the cache is bounded: least
+# recently used entries go first, and expired ones are swept on write.
+_MAX_ENTRIES = 4096
+_SWEEP_INTERVAL = 60
+
+_CACHE: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+_LOCK = threading.Lock()
+_next_sweep = 0.0
+
+
+def get_cached(key: str) -> Optional[Any]:
+    """Return the cached value for *key*, or None if missing/expired."""
+    with _LOCK:
+        entry = _CACHE.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _CACHE[key]
+            return None
+        _CACHE.move_to_end(key)
+        return value
+
+
+def _sweep_expired(now: float):
+    """Drop every expired entry. Caller holds _LOCK."""
+    for key in [k for k, (expires_at, _) in _CACHE.items() if expires_at < now]:
+        del _CACHE[key]
+
+
+def set_cached(key: str, value: Any, ttl: float) -> Any:
+    """Store *value* under *key* for *ttl* seconds and return it."""
+    global _next_sweep
+    now = time.monotonic()
+    with _LOCK:
+        if now >= _next_sweep:
+            _sweep_expired(now)
+            _next_sweep = now + _SWEEP_INTERVAL
+        _CACHE[key] = (now + ttl, value)
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > _MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+    return value
+
+
+def invalidate(prefix: str = ""):
+    """Drop every key starting with *prefix* (all keys if empty)."""
+    with _LOCK:
+        for key in [k for k in _CACHE if k.startswith(prefix)]:
+            del _CACHE[key]
@@ -0,0 +1,130 @@
+import os
+import secrets
+import shutil
+import sys
+from typing import Dict, Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+
+# Read the multipart body in 1 MiB chunks
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Per-file size caps
+MAX_IMAGE_BYTES = 5 << 20
+MAX_VIDEO_BYTES = 50 << 20
+
+_HAS_SENDFILE = sys.platform.startswith("linux") and hasattr(os, "sendfile")
+_SEP = os.sep
+
+
+def _upload_extension(filename: str) -> str:
+    """Lower-cased extension after the last dot, max 8 alnum chars, else 'bin'."""
+    if not filename or "." not in filename:
+        return "bin"
+    ext = filename.rsplit(".", 1)[1][:8].lower()
+    # Also rejects separators so the extension can't escape upload_dir
+    return ext if ext.isalnum() else "bin"
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large (max {max_bytes // (1 << 20)} MB)",
+    )
+
+
+def _copy_rolled_file(src, file_path: str):
+    """
+    Copy a spooled upload that already lives on disk.
+
+    On Linux this is done in-kernel with os.sendfile (no Python buffers);
+    elsewhere it falls back to copyfileobj with 1 MiB chunks.
+    """
+    with open(file_path, "wb") as buffer:
+        if _HAS_SENDFILE:
+            src_fd = src.fileno()
+            dst_fd = buffer.fileno()
+            offset = src.tell()
+            size = os.fstat(src_fd).st_size
+            while offset < size:
+                sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        else:
+            shutil.copyfileobj(src, buffer, length=UPLOAD_CHUNK_SIZE)
+
+
+async def save_upload(file: UploadFile, upload_dir: str, max_bytes: Optional[int] = None) -> str:
+    """
+    Stream an UploadFile to *upload_dir* without blocking the event loop.
+
+    Starlette spools bodies to a SpooledTemporaryFile. Once it has rolled
+    over to disk the copy is done in-kernel on a worker thread; small
+    in-memory bodies are streamed via the async UploadFile API + aiofiles.
+    Raises a 413 HTTPException if the upload is bigger than *max_bytes*.
+    No partial file is left behind on any failure (including a client
+    disconnect or cancellation). Returns the path of the saved file.
+    """
+    # 32 hex chars straight from urandom — no UUID object to build and format
+    filename = f"{secrets.token_hex(16)}.{_upload_extension(file.filename)}"
+    file_path = f"{upload_dir}{_SEP}{filename}"
+
+    rolled = getattr(file.file, "_rolled", False)
+    if rolled and max_bytes is not None:
+        size = os.fstat(file.file.fileno()).st_size - file.file.tell()
+        if size > max_bytes:
+            raise _too_large(max_bytes)
+
+    try:
+        if rolled:
+            await run_in_threadpool(_copy_rolled_file, file.file, file_path)
+            return file_path
+
+        written = 0
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise _too_large(max_bytes)
+                await buffer.write(chunk)
+    except BaseException:
+        try:
+            os.unlink(file_path)
+        except OSError:
+            pass
+        raise
+
+    return file_path
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject POSTs whose Content-Length exceeds the cap for their path with a
+    413, before Starlette parses and spools the multipart body to disk.
+
+    limits: path prefix -> max request body bytes (longest prefix wins)
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = sorted(limits.items(), key=lambda kv: len(kv[0]), reverse=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST":
+            path = scope["path"]
+            limit = next((cap for prefix, cap in self.limits if path.startswith(prefix)), None)
+            if limit is not None:
+                length = dict(scope["headers"]).get(b"content-length")
+                if length is not None and length.isdigit() and int(length) > limit:
+                    response = JSONResponse(
+                        {"detail": f"Upload too large (max {limit // (1 << 20)} MB)"},
+                        status_code=413,
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)